@@ -1,15 +1,46 @@
+import atexit
 import streamlit as st
 import sqlite3
 import pandas as pd
+import numpy as np
 from datetime import datetime, date
 import os
-from PIL import Image
-import base64
-import io
+import threading
 
+DETAIL_TYPES = (
+    "New Vehicle Delivery",
+    "CPO/Used Vehicle",
+    "Customer Car",
+    "Showroom Detail",
+    "Demo Vehicle",
+    "Full Detail",
+    "Interior Detail",
+    "Exterior Detail",
+    "Polish & Wax",
+    "Basic Wash",
+    "Engine Bay",
+    "Other"
+)
+
+# Entries as display-ready columns, newest first
+ENTRIES_DF_SQL = """
+    SELECT id AS ID, license_plate AS "License Plate", detail_type AS Type,
+           advisor AS Advisor, hours AS Hours, entry_date AS Date,
+           notes AS Notes, created_at AS Created
+    FROM entries
+    ORDER BY entry_date DESC, created_at DESC
+    LIMIT ? OFFSET ?
+"""
+
+@st.cache_resource
 def init_db():
-    """Initialize SQLite database"""
+    """Initialize SQLite database (one shared connection per process)"""
     conn = sqlite3.connect('detailing.db', check_same_thread=False)
+    # WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS entries (
@@ -24,13 +55,56 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Matches the log's ORDER BY, so LIMIT/OFFSET pages read straight off the index
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_date_created ON entries(entry_date DESC, created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_plate ON entries(license_plate)")
+    cursor.execute("DROP INDEX IF EXISTS idx_entries_date")  # covered by the composite index
     
     # Create photos directory if it doesn't exist
     if not os.path.exists('photos'):
         os.makedirs('photos')
     conn.commit()
+    # The cached connection lives for the whole process; close it on exit
+    atexit.register(conn.close)
     return conn
 
+# Cached reads - the leading underscore tells Streamlit not to hash the connection
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_stats(_conn, today):
+    """Today's and all-time entry counts and hours"""
+    cursor = _conn.cursor()
+    
+    # One pass over the table: all-time totals plus conditional sums for today
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(hours), 0),
+               COALESCE(SUM(CASE WHEN entry_date = ? THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN entry_date = ? THEN hours ELSE 0 END), 0)
+        FROM entries
+    """, (today, today))
+    return cursor.fetchone()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_entries_df(_conn, limit=-1, offset=0):
+    """Entries newest first, read straight into a DataFrame"""
+    return pd.read_sql_query(ENTRIES_DF_SQL, _conn, params=(limit, offset))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_csv(_conn):
+    """Every entry as CSV bytes, serialized once per data change"""
+    return cached_entries_df(_conn).to_csv(index=False).encode()
+
+@st.cache_resource
+def db_write_lock():
+    """Serializes write transactions on the shared connection. Cached rather than
+    a plain global, which the script would recreate on every rerun"""
+    return threading.Lock()
+
+def clear_entry_caches():
+    """Drop cached reads after the entries table changes"""
+    cached_stats.clear()
+    cached_entries_df.clear()
+    cached_csv.clear()
+
 def save_uploaded_photos(uploaded_files, entry_id):
     """Save uploaded photos and return list of filenames"""
     photo_filenames = []
@@ -53,6 +127,9 @@ def display_photos(photo_string):
     if not photo_string:
         return
     
+    # Pillow is only needed when there are photos to show
+    from PIL import Image
+    
     photo_files = photo_string.split(',')
     if not photo_files or photo_files == ['']:
         return
@@ -134,12 +211,10 @@ def main():
     """, unsafe_allow_html=True)
     
     # Initialize database
-    if 'db_conn' not in st.session_state:
-        st.session_state.db_conn = init_db()
+    conn = init_db()
     
-    conn = st.session_state.db_conn
-    
-    # Navigation
+    # Navigation. Each tab body is a fragment, so a widget in one tab
+    # reruns only that tab; reads come from the cached helpers above.
     tab1, tab2, tab3 = st.tabs(["🏠 Dashboard", "📝 New Entry", "📋 View Log"])
     
     with tab1:
@@ -151,23 +226,12 @@ def main():
     with tab3:
         show_log(conn)
 
+@st.fragment
 def show_dashboard(conn):
     """Show dashboard with stats and recent entries"""
-    cursor = conn.cursor()
-    
     # Get stats
-    cursor.execute("SELECT COUNT(*) FROM entries")
-    total = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries")
-    total_hours = cursor.fetchone()[0]
-    
     today = date.today().strftime('%Y-%m-%d')
-    cursor.execute("SELECT COUNT(*) FROM entries WHERE entry_date = ?", (today,))
-    today_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries WHERE entry_date = ?", (today,))
-    today_hours = cursor.fetchone()[0]
+    total, total_hours, today_count, today_hours = cached_stats(conn, today)
     
     # Display stats
     st.markdown(f"""
@@ -207,17 +271,8 @@ def show_dashboard(conn):
     
     with col3:
         st.markdown("**📊 Export Data**")
-        cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC")
-        entries = cursor.fetchall()
-        if entries:
-            # Create DataFrame without specifying columns to avoid mismatch
-            df = pd.DataFrame(entries)
-            # Set proper column names based on actual data
-            df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Created'] if len(df.columns) == 8 else ['ID', 'License Plate', 'Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes', 'Created']
-            # Remove location column if it exists
-            if 'Location' in df.columns:
-                df = df.drop('Location', axis=1)
-            csv = df.to_csv(index=False)
+        if total:
+            csv = cached_csv(conn)
             st.download_button(
                 "📁 Download CSV",
                 csv,
@@ -230,32 +285,15 @@ def show_dashboard(conn):
     
     # Recent entries
     st.subheader("Recent Entries")
-    cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC, created_at DESC LIMIT 5")
-    entries = cursor.fetchall()
+    preview_df = cached_entries_df(conn, 5)[['License Plate', 'Type', 'Advisor', 'Date', 'Hours']]
     
-    if entries:
-        for entry in entries:
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                
-                with col1:
-                    st.write(f"**{entry[1]}**")  # License Plate
-                    st.caption(f"{entry[2]}")  # Detail Type
-                
-                with col2:
-                    st.write(f"{entry[3]}")  # Advisor Name
-                
-                with col3:
-                    st.write(f"{entry[5]}")  # Date
-                
-                with col4:
-                    hours_color = "🔴" if float(entry[4]) > 3 else "⏱️"  # Hours
-                    st.write(f"{hours_color} {entry[4]}h")
-                
-                st.divider()
+    if not preview_df.empty:
+        preview_df['Hours'] = np.where(preview_df['Hours'] > 3, '🔴 ', '⏱️ ') + preview_df['Hours'].astype(str) + 'h'
+        st.table(preview_df.set_index('License Plate'))
     else:
         st.info("No entries yet. Add your first entry to get started!")
 
+@st.fragment
 def show_new_entry(conn):
     """Show new entry form"""
     st.header("Add New Entry")
@@ -265,20 +303,7 @@ def show_new_entry(conn):
     with st.form("new_entry_form"):
         license_plate = st.text_input("License Plate *", placeholder="ABC-123")
         
-        detail_type = st.selectbox("Detail Type *", [
-            "New Vehicle Delivery",
-            "CPO/Used Vehicle", 
-            "Customer Car",
-            "Showroom Detail",
-            "Demo Vehicle",
-            "Full Detail",
-            "Interior Detail",
-            "Exterior Detail",
-            "Polish & Wax",
-            "Basic Wash",
-            "Engine Bay",
-            "Other"
-        ])
+        detail_type = st.selectbox("Detail Type *", DETAIL_TYPES)
         
         advisor = st.text_input("Advisor/Detailer Name *", placeholder="Enter name")
         
@@ -301,41 +326,62 @@ def show_new_entry(conn):
             st.error("❌ Hours must be greater than 0")
         else:
             try:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO entries (license_plate, detail_type, advisor, hours, entry_date, notes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (license_plate.upper().strip(), detail_type, advisor.strip(), hours, str(entry_date), notes.strip()))
-                conn.commit()
+                # The connection context manager commits once, or rolls back on error;
+                # the lock keeps other sessions' writes out of this transaction
+                with db_write_lock(), conn:
+                    conn.execute('''
+                        INSERT INTO entries (license_plate, detail_type, advisor, hours, entry_date, notes)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (license_plate.upper().strip(), detail_type, advisor.strip(), hours, str(entry_date), notes.strip()))
+                clear_entry_caches()
                 
-                # Show success message with entry details
-                st.success(f"✅ Entry added successfully!")
-                st.info(f"**{license_plate.upper()}** • {detail_type} • {advisor} • {hours}h • {entry_date}")
-                st.balloons()
-                
-                # Wait a moment for user to see the feedback, then refresh
-                import time
-                time.sleep(1)
+                # A toast stays up across the rerun, so there is no need to wait
+                st.toast(f"**{license_plate.strip().upper()}** • {detail_type} • {advisor.strip()} • {hours}h • {entry_date}", icon="✅")
                 st.rerun()
             except Exception as e:
                 st.error(f"❌ Error adding entry: {e}")
 
+@st.fragment
+def show_log_table(conn, total):
+    """One page of the log; paging reruns only this fragment"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 50, 100])
+    with col2:
+        page_count = (total + page_size - 1) // page_size
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    
+    df = cached_entries_df(conn, page_size, (page - 1) * page_size)[
+        ['License Plate', 'Type', 'Advisor', 'Date', 'Hours', 'Notes', 'ID']
+    ]
+    # Long-job marker computed for the whole column at once
+    df.insert(0, '⚠', np.where(df['Hours'] > 3, '🔴', '⏱️'))
+    st.dataframe(
+        df,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'Hours': st.column_config.NumberColumn(format="%.2f h"),
+            'Notes': st.column_config.TextColumn(width="medium")
+        }
+    )
+    st.caption(f"Page {page} of {page_count}")
+
+@st.fragment
 def show_log(conn):
     """Show all entries log"""
     st.header("Entry Log")
     
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC, created_at DESC")
-    entries = cursor.fetchall()
+    today = date.today().strftime('%Y-%m-%d')
+    total, total_hours, _, _ = cached_stats(conn, today)
     
-    if entries:
+    if total:
         # Stats
-        total_hours = sum(float(entry[4]) for entry in entries)  # Hours are at index 4
-        avg_hours = total_hours / len(entries) if entries else 0
+        avg_hours = total_hours / total
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Entries", len(entries))
+            st.metric("Total Entries", total)
         with col2:
             st.metric("Total Hours", f"{total_hours:.1f}h")
         with col3:
@@ -343,64 +389,13 @@ def show_log(conn):
         
         st.divider()
         
-        # Display entries in clean format
+        # Display one page of entries as a single table
         st.subheader("Entry Log (Newest First)")
-        
-        # Header row
-        col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 2, 1.5, 1, 1])
-        with col1:
-            st.write("**License Plate**")
-        with col2:
-            st.write("**Detail Type**")
-        with col3:
-            st.write("**Detailer**")
-        with col4:
-            st.write("**Date**")
-        with col5:
-            st.write("**Hours**")
-        with col6:
-            st.write("**ID**")
-        
-        st.divider()
-        
-        for entry in entries:
-            col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 2, 1.5, 1, 1])
-            
-            with col1:
-                st.write(f"**{entry[1]}**")  # License Plate
-            
-            with col2:
-                st.write(f"{entry[2]}")  # Detail Type
-            
-            with col3:
-                st.write(f"{entry[3]}")  # Advisor/Detailer Name
-            
-            with col4:
-                st.write(f"{entry[5]}")  # Date
-            
-            with col5:
-                hours_indicator = "🔴" if float(entry[4]) > 3 else "⏱️"  # Hours
-                st.write(f"{hours_indicator} {entry[4]}h")
-            
-            with col6:
-                st.write(f"#{entry[0]}")  # Entry ID
-            
-            # Show notes if they exist
-            if entry[6]:  # Notes (adjusted index)
-                st.caption(f"📝 {entry[6][:100]}{'...' if len(entry[6]) > 100 else ''}")
-            
-            st.divider()
+        show_log_table(conn, total)
         
         # Export option
         st.divider()
-        # Create DataFrame without specifying columns to avoid mismatch
-        df = pd.DataFrame(entries)
-        # Set proper column names based on actual data
-        df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Created'] if len(df.columns) == 8 else ['ID', 'License Plate', 'Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes', 'Created']
-        # Remove location column if it exists
-        if 'Location' in df.columns:
-            df = df.drop('Location', axis=1)
-        csv = df.to_csv(index=False)
+        csv = cached_csv(conn)
         st.download_button(
             "📥 Export All Entries to CSV",
             csv,
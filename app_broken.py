@@ -3,13 +3,162 @@ import sqlite3
 import pandas as pd
 from datetime import datetime, date
 import os
-from PIL import Image
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
 import base64
 import io
+import uuid
 
+ENTRIES_EXPORT_SQL = """
+    SELECT id AS ID, license_plate AS "License Plate", detail_type AS Type,
+           advisor AS Advisor, hours AS Hours, entry_date AS Date,
+           COALESCE(notes, '') AS Notes, created_at AS Created
+    FROM entries
+    ORDER BY entry_date DESC, created_at DESC
+"""
+
+INSERT_ENTRY_SQL = """
+    INSERT INTO entries (license_plate, detail_type, advisor, hours, entry_date, notes, photos)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_PHOTO_SQL = "INSERT INTO photos (entry_id, filename) VALUES (?, ?)"
+# Columns read by render_entry_card; photo names come from the photos table
+ENTRY_CARD_SQL = """
+    SELECT id, license_plate, detail_type, advisor, hours, entry_date, notes
+    FROM entries
+    ORDER BY entry_date DESC, created_at DESC
+"""
+IMPORT_COLUMNS = ['License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes']
+LOG_PAGE_SIZE = 25
+PHOTO_DIR = 'photos/'
+BADGES = [
+    ("🟢", "#10b981"),  # Quick job: up to 1h
+    ("🟡", "#f59e0b"),  # Standard job: up to 3h
+    ("🟠", "#ea580c"),  # Long job: up to 6h
+    ("🔴", "#dc2626"),  # Extended job
+]
+
+APP_CSS = """
+<style>
+.stApp {
+    padding-top: 1rem;
+}
+.main .block-container {
+    padding-top: 1rem;
+    padding-bottom: 1rem;
+    max-width: 100%;
+}
+.stButton > button {
+    width: 100%;
+    height: 3rem;
+    font-size: 1.1rem;
+    border-radius: 0.5rem;
+    font-weight: 600;
+}
+.stSelectbox > div > div {
+    font-size: 1rem;
+}
+.stTextInput > div > div > input {
+    font-size: 1rem;
+    height: 3rem;
+}
+.stTextArea > div > div > textarea {
+    font-size: 1rem;
+}
+.stNumberInput > div > div > input {
+    font-size: 1rem;
+    height: 3rem;
+}
+.stFileUploader > div {
+    font-size: 1rem;
+    border: 2px dashed #cbd5e1;
+    border-radius: 0.5rem;
+    padding: 2rem;
+    text-align: center;
+}
+.stFileUploader:hover > div {
+    border-color: #3b82f6;
+    background-color: #f8fafc;
+}
+@media (max-width: 768px) {
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 0.25rem;
+    }
+    .stTabs [data-baseweb="tab"] {
+        padding: 0.75rem 1rem;
+        font-size: 1rem;
+    }
+    .stColumns {
+        gap: 0.5rem;
+    }
+    .main .block-container {
+        padding-left: 1rem;
+        padding-right: 1rem;
+    }
+}
+.hours-badge {
+    display: inline-flex;
+    align-items: center;
+    padding: 0.25rem 0.5rem;
+    border-radius: 0.375rem;
+    font-size: 0.875rem;
+    font-weight: 600;
+}
+</style>
+"""
+
+HEADER_HTML = """
+<div style="background: linear-gradient(135deg, #2563eb 0%, #3b82f6 50%, #1d4ed8 100%); 
+            padding: 1.5rem; border-radius: 0.75rem; margin-bottom: 2rem; 
+            color: white; text-align: center; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);">
+    <h1 style="margin: 0; font-size: 2rem;">🚗 Auto Detailing Tracker</h1>
+    <p style="margin: 0.5rem 0 0 0; opacity: 0.9;">Professional workflow management for detailing teams</p>
+</div>
+"""
+
+# Entry card markup, filled per entry with str.format_map
+ENTRY_CARD_HTML = """
+<div style="background: white; padding: 1.25rem; border-radius: 0.75rem; 
+           border: 1px solid #e2e8f0; margin-bottom: 1rem;
+           box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+    <div style="display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 1rem;">
+        <div style="flex: 1; min-width: 200px;">
+            <div style="font-weight: 700; font-size: 1.2rem; color: #1f2937; margin-bottom: 0.5rem;">
+                {license_plate}
+            </div>
+            <div style="color: #374151; font-size: 1rem; margin-bottom: 0.25rem;">
+                <strong>{detail_type}</strong> • {advisor}
+            </div>
+            <div style="color: #6b7280; font-size: 0.9rem; margin-bottom: 0.25rem;">
+                📅 {entry_date}
+            </div>{notes_html}
+        </div>
+        <div style="text-align: right; display: flex; flex-direction: column; align-items: end; gap: 0.5rem;">
+            <span style="background: {color}; color: white; padding: 0.5rem 0.75rem; 
+                        border-radius: 0.5rem; font-weight: 700; font-size: 1rem;">
+                {badge} {hours}h
+            </span>{id_html}
+        </div>
+    </div>
+</div>
+"""
+CARD_NOTES_HTML = '<div style="color: #4b5563; font-size: 0.9rem; font-style: italic; margin-top: 0.5rem;">"{notes}"</div>'
+CARD_ID_HTML = '<div style="color: #9ca3af; font-size: 0.8rem;">ID: #{id}</div>'
+
+@st.cache_resource
 def init_db():
-    """Initialize SQLite database"""
+    """Initialize SQLite database; the one connection is shared by every session"""
     conn = sqlite3.connect('detailing.db', check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL lets reads proceed during a write; NORMAL sync skips the per-commit fsync
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA foreign_keys=ON")
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS entries (
@@ -18,67 +167,267 @@ def init_db():
             detail_type TEXT NOT NULL,
             advisor TEXT NOT NULL,
             hours REAL NOT NULL,
-            entry_date DATE NOT NULL,
+            entry_date DATE NOT NULL CHECK (entry_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'),
             notes TEXT,
             photos TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Serves both the ORDER BY entry_date DESC, created_at DESC listings and,
+    # through its leading column, the entry_date = ? lookups
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_entries_date
+        ON entries(entry_date DESC, created_at DESC)
+    ''')
+    # One row per photo. entries.photos keeps the comma-packed list as well,
+    # since app_basic shares this file and reads only that column
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS photos (
+            id INTEGER PRIMARY KEY,
+            entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+            filename TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_photos_entry ON photos(entry_id)')
     
     # Create photos directory if it doesn't exist
-    if not os.path.exists('photos'):
-        os.makedirs('photos')
+    if not os.path.exists(PHOTO_DIR):
+        os.makedirs(PHOTO_DIR)
     conn.commit()
     return conn
 
-def save_uploaded_photos(uploaded_files, entry_id):
-    """Save uploaded photos and return list of filenames"""
+@st.cache_resource
+def db_write_lock():
+    """Keeps sessions' write transactions on the shared connection from interleaving"""
+    return threading.Lock()
+
+@st.cache_resource
+def _packed_photos_seen():
+    """data_version at the last copy of packed photo lists, shared by all sessions"""
+    return {'version': None}
+
+def sync_packed_photos(conn):
+    """Copy in comma-packed photo lists written by app_basic since the last check"""
+    version = data_version(conn)
+    seen = _packed_photos_seen()
+    if seen['version'] == version:
+        return
+    with db_write_lock(), conn:
+        packed = conn.execute('''
+            SELECT id, photos FROM entries
+            WHERE photos <> '' AND id NOT IN (SELECT entry_id FROM photos)
+        ''').fetchall()
+        conn.executemany(INSERT_PHOTO_SQL, ((entry_id, name) for entry_id, photos in packed
+                                            for name in photos.split(',') if name))
+    seen['version'] = version
+
+def load_uploaded_photos(uploaded_files):
+    """Read and decode each upload once; returns (name, bytes, thumbnail or None) tuples"""
+    photos = []
+    for uploaded_file in uploaded_files:
+        data = uploaded_file.getvalue()
+        try:
+            image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+            image.thumbnail((400, 400), Image.Resampling.LANCZOS)
+        except Exception:
+            image = None  # e.g. HEIC without a Pillow plugin
+        photos.append((uploaded_file.name, data, image))
+    return photos
+
+def write_photo_file(path, data):
+    """Write upload bytes with os.write, no buffered file object. There is no
+    fsync, so after a power loss a committed entry can point at a missing or
+    truncated photo, which display_photos skips or captions as an error"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def save_thumbnail(thumbnail, path):
+    """Save the thumbnail made at upload so renders never ship the full-size photo"""
+    thumbnail.convert('RGB').save(path, "JPEG", quality=75, optimize=True, progressive=True)
+
+def save_uploaded_photos(photos, prefix):
+    """Save loaded photos and their thumbnails and return list of filenames"""
     photo_filenames = []
-    for i, uploaded_file in enumerate(uploaded_files):
-        if uploaded_file is not None:
+    # The files are independent and both writes and JPEG encoding release
+    # the GIL, so the files are written four at a time
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        jobs = []
+        for i, (name, data, thumbnail) in enumerate(photos):
             # Create unique filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"entry_{entry_id}_{timestamp}_{i}.{uploaded_file.name.split('.')[-1]}"
-            filepath = os.path.join('photos', filename)
-            
-            # Save the file
-            with open(filepath, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+            filename = f"entry_{prefix}_{timestamp}_{i}.{name.split('.')[-1]}"
             photo_filenames.append(filename)
+            jobs.append(pool.submit(write_photo_file, PHOTO_DIR + filename, data))
+            # Without a thumbnail, display_photos falls back to the original
+            if thumbnail is not None:
+                jobs.append(pool.submit(save_thumbnail, thumbnail, PHOTO_DIR + thumbnail_name(filename)))
+    # Leaving the pool waits for every job, so nothing is still writing while
+    # the files of a failed batch are removed
+    try:
+        for job in jobs:
+            job.result()  # re-raise a failed write before any row is inserted
+    except Exception:
+        remove_photo_files(photo_filenames)
+        raise
     
-    return ','.join(photo_filenames)
+    return photo_filenames
 
-def display_photos(photo_string):
-    """Display photos in a grid layout"""
-    if not photo_string:
-        return
-    
-    photo_files = photo_string.split(',')
-    if not photo_files or photo_files == ['']:
+def remove_photo_files(photo_filenames):
+    """Delete saved photos and thumbnails that ended up with no entry"""
+    for filename in photo_filenames:
+        for name in (filename, thumbnail_name(filename)):
+            try:
+                os.remove(PHOTO_DIR + name)
+            except FileNotFoundError:
+                pass
+
+def thumbnail_name(photo_file):
+    """Filename of the JPEG thumbnail saved alongside an uploaded photo"""
+    return f"thumb_{os.path.splitext(photo_file)[0]}.jpg"
+
+@st.cache_data(ttl=5, show_spinner=False)
+def existing_photos():
+    """Path of each file in photos/ keyed by name, from one directory read"""
+    with os.scandir(PHOTO_DIR) as it:
+        return {e.name: PHOTO_DIR + e.name for e in it}
+
+def get_entry_photos(conn, entry_ids):
+    """Photo filenames for the given entries in one query, grouped by entry id"""
+    if not entry_ids:
+        return {}
+    placeholders = ','.join('?' * len(entry_ids))
+    by_entry = {}
+    for entry_id, filename in conn.execute(
+            f"SELECT entry_id, filename FROM photos WHERE entry_id IN ({placeholders}) ORDER BY id",
+            entry_ids):
+        by_entry.setdefault(entry_id, []).append(filename)
+    return by_entry
+
+def display_photos(photo_files, existing):
+    """Display photos in a grid layout; existing is the dict from existing_photos()"""
+    if not photo_files:
         return
     
     # Display photos in responsive columns
     cols = st.columns(min(4, len(photo_files)))
     for i, photo_file in enumerate(photo_files):
-        if photo_file and os.path.exists(os.path.join('photos', photo_file)):
+        if photo_file and photo_file in existing:
             with cols[i % 4]:
                 try:
-                    image = Image.open(os.path.join('photos', photo_file))
-                    st.image(image, caption=f"Photo {i+1}", use_column_width=True)
+                    # Hand Streamlit the path: it serves the file's bytes as-is
+                    # instead of decoding and re-encoding a PIL image every rerun.
+                    # Entries saved before thumbnails existed show the original.
+                    path = existing.get(thumbnail_name(photo_file)) or existing[photo_file]
+                    st.image(path, caption=f"Photo {i+1}", use_column_width=True)
                 except Exception:
                     st.caption(f"📸 Photo {i+1} (error loading)")
 
+def data_version(conn):
+    """Changes whenever another connection (e.g. one of the other apps) commits to the database"""
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+# Cached reads take data_version() as a key so outside writes show up at once;
+# this app's own writes clear them through clear_entry_caches()
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_stats(_conn, today, version):
+    """Total and today's entry counts and hours in a single query"""
+    return _conn.execute('''
+        SELECT COUNT(*),
+               COALESCE(SUM(hours), 0),
+               COUNT(CASE WHEN entry_date = ? THEN 1 END),
+               COALESCE(SUM(CASE WHEN entry_date = ? THEN hours END), 0)
+        FROM entries
+    ''', (today, today)).fetchone()[:]  # plain tuple: cached values are pickled
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _recent_entries(_conn, version, limit=5):
+    """Newest entries for the dashboard, as dicts so they can be cached"""
+    return [dict(row) for row in _conn.execute(
+        ENTRY_CARD_SQL + " LIMIT ?", (limit,))]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _entries_csv_bytes(_conn, version):
+    # Serialized once per change rather than on every rerun that draws the button.
+    # Rows stream from SQLite 5000 at a time into the bytes buffer, so neither
+    # the whole table nor one big str is ever held as a DataFrame
+    buf = io.BytesIO()
+    for i, chunk in enumerate(pd.read_sql_query(ENTRIES_EXPORT_SQL, _conn, chunksize=5000)):
+        chunk.to_csv(buf, header=i == 0, index=False)
+    return buf.getvalue()
+
+def clear_entry_caches():
+    """Drop cached reads after the entries table changes"""
+    _fetch_stats.clear()
+    _recent_entries.clear()
+    _entries_csv_bytes.clear()
+    existing_photos.clear()
+
+def csv_import_rows(csv_file, counts):
+    """Yield insert rows from an exported CSV, parsed 1000 lines at a time.
+    Rows the entry form would refuse (blank plate or advisor, hours outside
+    (0, 24], a date that isn't YYYY-MM-DD) are left out and tallied in
+    counts['skipped']; text in hours would otherwise break every card render"""
+    counts['skipped'] = 0
+    for chunk in pd.read_csv(csv_file, chunksize=1000, dtype={'License Plate': str, 'Advisor': str, 'Notes': str}):
+        missing = [col for col in IMPORT_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        chunk = chunk[IMPORT_COLUMNS].fillna({'Notes': ''})
+        chunk['License Plate'] = chunk['License Plate'].str.upper().str.strip()
+        chunk['Advisor'] = chunk['Advisor'].str.strip()
+        chunk['Hours'] = pd.to_numeric(chunk['Hours'], errors='coerce').astype(float)
+        dates = pd.to_datetime(chunk['Date'], format='%Y-%m-%d', errors='coerce')
+        chunk['Date'] = dates.dt.strftime('%Y-%m-%d')
+        valid = (chunk['License Plate'].fillna('') != '') & (chunk['Advisor'].fillna('') != '') \
+            & chunk['Type'].notna() & (chunk['Hours'] > 0) & (chunk['Hours'] <= 24) & dates.notna()
+        counts['skipped'] += int((~valid).sum())
+        chunk = chunk[valid].assign(Photos='')
+        yield from chunk.itertuples(index=False, name=None)
+
+def bulk_import(conn, rows_iter):
+    """Insert (plate, type, advisor, hours, date, notes, photos) rows in one transaction"""
+    try:
+        with db_write_lock(), conn:
+            cursor = conn.executemany(INSERT_ENTRY_SQL, rows_iter)
+    finally:
+        # Also after a rollback: other sessions read through this same
+        # connection and may have cached the uncommitted rows
+        clear_entry_caches()
+    return cursor.rowcount
+
+@functools.lru_cache(maxsize=128)
 def get_hours_badge(hours):
     """Return appropriate badge and color for hours worked"""
     hours = float(hours)
-    if hours <= 1:
-        return "🟢", "#10b981"  # Quick job
-    elif hours <= 3:
-        return "🟡", "#f59e0b"  # Standard job
-    elif hours <= 6:
-        return "🟠", "#ea580c"  # Long job
-    else:
-        return "🔴", "#dc2626"  # Extended job
+    return BADGES[(hours > 1) + (hours > 3) + (hours > 6)]
+
+def render_entry_card(entry, photo_files, photos_on_disk, detailed=False):
+    """Entry card shared by the dashboard (compact) and the log (detailed, with notes and ID)"""
+    badge, color = get_hours_badge(entry['hours'])
+    notes = entry['notes'] or ''  # NULL from the other apps' rows
+    notes_html = ''
+    if detailed and notes:
+        notes_html = CARD_NOTES_HTML.format(notes=notes[:150] + ('...' if len(notes) > 150 else ''))
+    id_html = CARD_ID_HTML.format(id=entry['id']) if detailed else ''
+    
+    with st.container():
+        st.markdown(ENTRY_CARD_HTML.format_map(dict(entry, badge=badge, color=color,
+                                                    notes_html=notes_html, id_html=id_html)),
+                    unsafe_allow_html=True)
+        
+        # Display photos if available
+        if photo_files:
+            if detailed:
+                st.markdown("**📸 Photos:**")
+            display_photos(photo_files, photos_on_disk)
+        
+        if detailed or photo_files:
+            st.markdown("---")
 
 def main():
     st.set_page_config(
@@ -88,95 +437,17 @@ def main():
         initial_sidebar_state="collapsed"
     )
     
-    # Enhanced mobile-friendly CSS
-    st.markdown("""
-    <style>
-    .stApp {
-        padding-top: 1rem;
-    }
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-        max-width: 100%;
-    }
-    .stButton > button {
-        width: 100%;
-        height: 3rem;
-        font-size: 1.1rem;
-        border-radius: 0.5rem;
-        font-weight: 600;
-    }
-    .stSelectbox > div > div {
-        font-size: 1rem;
-    }
-    .stTextInput > div > div > input {
-        font-size: 1rem;
-        height: 3rem;
-    }
-    .stTextArea > div > div > textarea {
-        font-size: 1rem;
-    }
-    .stNumberInput > div > div > input {
-        font-size: 1rem;
-        height: 3rem;
-    }
-    .stFileUploader > div {
-        font-size: 1rem;
-        border: 2px dashed #cbd5e1;
-        border-radius: 0.5rem;
-        padding: 2rem;
-        text-align: center;
-    }
-    .stFileUploader:hover > div {
-        border-color: #3b82f6;
-        background-color: #f8fafc;
-    }
-    @media (max-width: 768px) {
-        .stTabs [data-baseweb="tab-list"] {
-            gap: 0.25rem;
-        }
-        .stTabs [data-baseweb="tab"] {
-            padding: 0.75rem 1rem;
-            font-size: 1rem;
-        }
-        .stColumns {
-            gap: 0.5rem;
-        }
-        .main .block-container {
-            padding-left: 1rem;
-            padding-right: 1rem;
-        }
-    }
-    .hours-badge {
-        display: inline-flex;
-        align-items: center;
-        padding: 0.25rem 0.5rem;
-        border-radius: 0.375rem;
-        font-size: 0.875rem;
-        font-weight: 600;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
-    # Enhanced header with gradient
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #2563eb 0%, #3b82f6 50%, #1d4ed8 100%); 
-                padding: 1.5rem; border-radius: 0.75rem; margin-bottom: 2rem; 
-                color: white; text-align: center; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);">
-        <h1 style="margin: 0; font-size: 2rem;">🚗 Auto Detailing Tracker</h1>
-        <p style="margin: 0.5rem 0 0 0; opacity: 0.9;">Professional workflow management for detailing teams</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # Enhanced mobile-friendly CSS and header. Both are re-emitted on every
+    # run: Streamlit removes any element a rerun does not draw again.
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
     
     # Initialize database
-    if 'db_conn' not in st.session_state:
-        st.session_state.db_conn = init_db()
-    
-    conn = st.session_state.db_conn
+    conn = init_db()
+    sync_packed_photos(conn)
     
     # Initialize active tab state
-    if 'active_tab' not in st.session_state:
-        st.session_state.active_tab = 'dashboard'
+    st.session_state.setdefault("active_tab", "dashboard")
     
     # Enhanced navigation with icons
     tab1, tab2, tab3 = st.tabs(["🏠 Dashboard", "📝 New Entry", "📋 View Log"])
@@ -200,21 +471,11 @@ def main():
 
 def show_dashboard(conn):
     """Enhanced dashboard with mobile-friendly stats"""
-    cursor = conn.cursor()
+    version = data_version(conn)
     
     # Get comprehensive stats
-    cursor.execute("SELECT COUNT(*) FROM entries")
-    total = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries")
-    total_hours = cursor.fetchone()[0]
-    
-    today = date.today().strftime('%Y-%m-%d')
-    cursor.execute("SELECT COUNT(*) FROM entries WHERE entry_date = ?", (today,))
-    today_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries WHERE entry_date = ?", (today,))
-    today_hours = cursor.fetchone()[0]
+    today = date.today().isoformat()
+    total, total_hours, today_count, today_hours = _fetch_stats(conn, today, version)
     
     # Enhanced stats display
     st.markdown(f"""
@@ -261,19 +522,8 @@ def show_dashboard(conn):
     
     with col3:
         # Enhanced export with data check
-        cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC")
-        entries = cursor.fetchall()
-        if entries:
-            # Create DataFrame with proper column handling
-            df = pd.DataFrame(entries)
-            # Handle both old and new schema
-            if len(df.columns) == 9:
-                df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Photos', 'Created']
-                export_df = df.drop('Photos', axis=1)
-            else:
-                df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Created']
-                export_df = df
-            csv = export_df.to_csv(index=False)
+        if total:
+            csv = _entries_csv_bytes(conn, version)
             
             st.download_button(
                 "📊 Export Data",
@@ -287,51 +537,20 @@ def show_dashboard(conn):
     
     # Enhanced recent entries display
     st.subheader("🔄 Recent Entries")
-    cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC, created_at DESC LIMIT 5")
-    entries = cursor.fetchall()
+    entries = _recent_entries(conn, version)
     
     if entries:
+        photos_on_disk = existing_photos()
+        entry_photos = get_entry_photos(conn, [entry['id'] for entry in entries])
         for entry in entries:
-            badge, color = get_hours_badge(entry[4])
-            
-            # Mobile-friendly entry cards
-            with st.container():
-                st.markdown(f"""
-                <div style="background: white; padding: 1rem; border-radius: 0.5rem; 
-                           border: 1px solid #e2e8f0; margin-bottom: 0.75rem;
-                           box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                    <div style="display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 0.5rem;">
-                        <div style="flex: 1; min-width: 200px;">
-                            <div style="font-weight: 700; font-size: 1.1rem; color: #1f2937; margin-bottom: 0.25rem;">
-                                {entry[1]}
-                            </div>
-                            <div style="color: #6b7280; font-size: 0.9rem; margin-bottom: 0.25rem;">
-                                {entry[2]} • {entry[3]}
-                            </div>
-                            <div style="color: #9ca3af; font-size: 0.8rem;">
-                                {entry[5]}
-                            </div>
-                        </div>
-                        <div style="text-align: right;">
-                            <span style="background: {color}; color: white; padding: 0.25rem 0.5rem; 
-                                        border-radius: 0.375rem; font-weight: 600; font-size: 0.9rem;">
-                                {badge} {entry[4]}h
-                            </span>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Show photos if available
-                if entry[7]:  # Photos column
-                    display_photos(entry[7])
-                    st.markdown("---")
+            render_entry_card(entry, entry_photos.get(entry['id']), photos_on_disk)
     else:
         st.info("🎯 No entries yet. Add your first detailing entry to get started!")
 
 def show_new_entry(conn):
     """Enhanced new entry form with photo upload and timer"""
     st.header("📝 Add New Entry")
+    st.session_state.setdefault("timer_start", None)
     
     # Enhanced tips and timer section
     with st.expander("💡 Tips & Timer", expanded=False):
@@ -360,11 +579,11 @@ def show_new_entry(conn):
                 st.success("Timer started!")
                 st.rerun()
             
-            if 'timer_start' in st.session_state:
+            if st.session_state.timer_start is not None:
                 elapsed = (datetime.now() - st.session_state.timer_start).total_seconds() / 3600
                 st.metric("Active Timer", f"{elapsed:.1f}h")
                 if st.button("⏹️ Stop Timer", use_container_width=True):
-                    del st.session_state.timer_start
+                    st.session_state.timer_start = None
                     st.rerun()
     
     with st.form("new_entry_form"):
@@ -396,7 +615,7 @@ def show_new_entry(conn):
             advisor = st.text_input("Detailer Name *", placeholder="Enter detailer name")
         with col4:
             # Smart hours input with timer integration
-            if 'timer_start' in st.session_state:
+            if st.session_state.timer_start is not None:
                 elapsed = (datetime.now() - st.session_state.timer_start).total_seconds() / 3600
                 default_hours = round(max(elapsed, 0.1), 1)
             else:
@@ -417,7 +636,9 @@ def show_new_entry(conn):
             help="Maximum 8 photos. Supported formats: JPEG, PNG, HEIC"
         )
         
-        # Photo preview
+        # Photo preview; each upload is decoded here once and the same
+        # thumbnails are saved on submit
+        photos = []
         if uploaded_files:
             if len(uploaded_files) > 8:
                 st.warning("⚠️ Maximum 8 photos allowed. Only the first 8 will be saved.")
@@ -426,14 +647,13 @@ def show_new_entry(conn):
             st.success(f"📷 {len(uploaded_files)} photo(s) ready to upload")
             
             # Preview grid
-            cols = st.columns(min(4, len(uploaded_files)))
-            for i, uploaded_file in enumerate(uploaded_files):
+            photos = load_uploaded_photos(uploaded_files)
+            cols = st.columns(min(4, len(photos)))
+            for i, (_, _, thumbnail) in enumerate(photos):
                 with cols[i % 4]:
-                    try:
-                        image = Image.open(uploaded_file)
-                        image.thumbnail((200, 200))
-                        st.image(image, caption=f"Photo {i+1}", use_column_width=True)
-                    except Exception:
+                    if thumbnail is not None:
+                        st.image(thumbnail, caption=f"Photo {i+1}", use_column_width=True)
+                    else:
                         st.caption(f"📸 Photo {i+1}")
         
         # Notes
@@ -453,11 +673,11 @@ def show_new_entry(conn):
             submitted = st.form_submit_button("✅ Add Entry", type="primary", use_container_width=True)
         
         with col_timer_action:
-            if 'timer_start' in st.session_state:
+            if st.session_state.timer_start is not None:
                 if st.form_submit_button("⏹️ Stop & Submit", use_container_width=True):
                     elapsed = (datetime.now() - st.session_state.timer_start).total_seconds() / 3600
                     hours = round(max(elapsed, 0.1), 1)
-                    del st.session_state.timer_start
+                    st.session_state.timer_start = None
     
     # Form processing
     if submitted:
@@ -469,23 +689,19 @@ def show_new_entry(conn):
             st.error("❌ Hours must be greater than 0")
         else:
             try:
-                cursor = conn.cursor()
-                
-                # Insert entry first to get ID
-                cursor.execute('''
-                    INSERT INTO entries (license_plate, detail_type, advisor, hours, entry_date, notes, photos)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (license_plate.upper().strip(), detail_type, advisor.strip(), hours, str(entry_date), notes.strip(), ''))
-                
-                entry_id = cursor.lastrowid
-                
-                # Save photos if any
-                photo_string = ''
-                if uploaded_files:
-                    photo_string = save_uploaded_photos(uploaded_files[:8], entry_id)
-                    cursor.execute('UPDATE entries SET photos = ? WHERE id = ?', (photo_string, entry_id))
-                
-                conn.commit()
+                # Photos go to disk under a random prefix before the transaction
+                # opens, so the shared connection only holds it for the two inserts
+                photo_files = save_uploaded_photos(photos, uuid.uuid4().hex) if photos else []
+                try:
+                    with db_write_lock(), conn:
+                        entry_id = conn.execute(INSERT_ENTRY_SQL, (license_plate.upper().strip(), detail_type, advisor.strip(), hours, entry_date.isoformat(), notes.strip(), ','.join(photo_files))).lastrowid
+                        conn.executemany(INSERT_PHOTO_SQL, ((entry_id, filename) for filename in photo_files))
+                except Exception:
+                    remove_photo_files(photo_files)
+                    raise
+                finally:
+                    # Also after a rollback: other sessions may have cached the uncommitted row
+                    clear_entry_caches()
                 
                 # Enhanced success feedback
                 badge, color = get_hours_badge(hours)
@@ -503,8 +719,7 @@ def show_new_entry(conn):
                 st.balloons()
                 
                 # Clear timer if running
-                if 'timer_start' in st.session_state:
-                    del st.session_state.timer_start
+                st.session_state.timer_start = None
                 
                 # Auto refresh after success
                 import time
@@ -519,85 +734,60 @@ def show_log(conn):
     st.header("📋 Entry Log")
     
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM entries ORDER BY entry_date DESC, created_at DESC")
-    entries = cursor.fetchall()
+    # Enhanced stats, aggregated by SQLite rather than summed row by row
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(hours), 0), COALESCE(AVG(hours), 0),
+               (SELECT COUNT(DISTINCT entry_id) FROM photos)
+        FROM entries
+    """)
+    total_entries, total_hours, avg_hours, with_photos = cursor.fetchone()
     
-    if entries:
-        # Enhanced stats
-        total_hours = sum(float(entry[4]) for entry in entries)
-        avg_hours = total_hours / len(entries) if entries else 0
-        
+    if total_entries:
         # Stats cards
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Entries", len(entries))
+            st.metric("Total Entries", total_entries)
         with col2:
             st.metric("Total Hours", f"{total_hours:.1f}h")
         with col3:
             st.metric("Average Hours", f"{avg_hours:.1f}h")
         with col4:
-            with_photos = sum(1 for entry in entries if entry[7])
             st.metric("With Photos", with_photos)
         
         st.markdown("---")
         
+        # Only one page of entries is loaded and rendered per run
+        page_count = (total_entries - 1) // LOG_PAGE_SIZE + 1
+        page = min(st.session_state.get('log_page', 0), page_count - 1)
+        cursor.execute(ENTRY_CARD_SQL + " LIMIT ? OFFSET ?", (LOG_PAGE_SIZE, page * LOG_PAGE_SIZE))
+        entries = cursor.fetchall()
+        
         # Entries display with enhanced mobile layout
+        photos_on_disk = existing_photos()
+        entry_photos = get_entry_photos(conn, [entry['id'] for entry in entries])
         for entry in entries:
-            badge, color = get_hours_badge(entry[4])
-            
-            with st.container():
-                # Enhanced entry card
-                st.markdown(f"""
-                <div style="background: white; padding: 1.25rem; border-radius: 0.75rem; 
-                           border: 1px solid #e2e8f0; margin-bottom: 1rem;
-                           box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    <div style="display: flex; justify-content: space-between; align-items: flex-start; flex-wrap: wrap; gap: 1rem;">
-                        <div style="flex: 1; min-width: 250px;">
-                            <div style="font-weight: 700; font-size: 1.2rem; color: #1f2937; margin-bottom: 0.5rem;">
-                                {entry[1]}
-                            </div>
-                            <div style="color: #374151; font-size: 1rem; margin-bottom: 0.25rem;">
-                                <strong>{entry[2]}</strong> • {entry[3]}
-                            </div>
-                            <div style="color: #6b7280; font-size: 0.9rem; margin-bottom: 0.25rem;">
-                                📅 {entry[5]}
-                            </div>
-                            {f'<div style="color: #4b5563; font-size: 0.9rem; font-style: italic; margin-top: 0.5rem;">"{entry[6][:150]}{"..." if len(entry[6] or "") > 150 else ""}"</div>' if entry[6] else ''}
-                        </div>
-                        <div style="text-align: right; display: flex; flex-direction: column; align-items: end; gap: 0.5rem;">
-                            <span style="background: {color}; color: white; padding: 0.5rem 0.75rem; 
-                                        border-radius: 0.5rem; font-weight: 700; font-size: 1rem;">
-                                {badge} {entry[4]}h
-                            </span>
-                            <div style="color: #9ca3af; font-size: 0.8rem;">
-                                ID: #{entry[0]}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Display photos if available
-                if entry[7]:  # Photos column
-                    st.markdown("**📸 Photos:**")
-                    display_photos(entry[7])
-                
-                st.markdown("---")
+            render_entry_card(entry, entry_photos.get(entry['id']), photos_on_disk, detailed=True)
+        
+        if page_count > 1:
+            col_prev, col_page, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ Previous", disabled=page == 0, use_container_width=True):
+                    st.session_state.log_page = page - 1
+                    st.rerun()
+            with col_page:
+                st.markdown(f"<div style='text-align: center; padding-top: 0.75rem;'>Page {page + 1} of {page_count}</div>", unsafe_allow_html=True)
+            with col_next:
+                if st.button("Next ➡️", disabled=page == page_count - 1, use_container_width=True):
+                    st.session_state.log_page = page + 1
+                    st.rerun()
         
         # Enhanced export
         st.subheader("📊 Export Options")
         col_export1, col_export2 = st.columns(2)
         
         with col_export1:
-            # Basic CSV export with proper column handling
-            df = pd.DataFrame(entries)
-            if len(df.columns) == 9:
-                df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Photos', 'Created']
-                export_df = df.drop('Photos', axis=1)
-            else:
-                df.columns = ['ID', 'License Plate', 'Type', 'Advisor', 'Hours', 'Date', 'Notes', 'Created']
-                export_df = df
-            csv = export_df.to_csv(index=False)
+            # Basic CSV export (photos are files on disk, so not exported)
+            csv = _entries_csv_bytes(conn, data_version(conn))
             
             st.download_button(
                 "📥 Export All Entries (CSV)",
@@ -610,7 +800,7 @@ def show_log(conn):
         with col_export2:
             # Summary report
             summary_data = {
-                'Total Entries': [len(entries)],
+                'Total Entries': [total_entries],
                 'Total Hours': [f"{total_hours:.1f}"],
                 'Average Hours': [f"{avg_hours:.1f}"],
                 'Entries with Photos': [with_photos],
@@ -628,6 +818,23 @@ def show_log(conn):
             )
     else:
         st.info("🎯 No entries found. Add your first detailing entry to get started!")
+    
+    # Bulk re-import of an exported CSV
+    with st.expander("📤 Import Entries (CSV)"):
+        st.caption(f"Uses the export's columns: {', '.join(IMPORT_COLUMNS)}")
+        uploaded_csv = st.file_uploader("CSV file", type="csv", key="import_csv")
+        if uploaded_csv and st.button("📤 Import Entries", use_container_width=True):
+            try:
+                counts = {}
+                count = bulk_import(conn, csv_import_rows(uploaded_csv, counts))
+                skipped_note = f" ({counts['skipped']} invalid rows skipped)" if counts['skipped'] else ""
+                if count:
+                    st.toast(f"✅ Imported {count} entries{skipped_note}")
+                    st.rerun()
+                else:
+                    st.error(f"❌ No entries were imported{skipped_note}")
+            except Exception as e:
+                st.error(f"❌ Error importing entries: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import atexit
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
@@ -5,14 +6,163 @@ from database import DetailingDatabase
 from utils import (
     validate_form_data, convert_entries_to_dataframe, format_hours,
     get_detail_types, get_locations, get_date_range_options,
-    show_success_message, show_error_message, show_warning_message,
-    export_to_csv, calculate_duration_stats, get_advisor_stats
+    show_error_message, show_warning_message,
+    export_to_csv, calculate_duration_stats, csv_to_entry_rows, IMPORT_COLUMNS
 )
 
-# Initialize database
+# Static page assets and form options, built once at import
+_CSS = """
+<style>
+.main-header {
+    background: linear-gradient(90deg, #2563eb 0%, #3b82f6 100%);
+    padding: 1rem;
+    border-radius: 0.5rem;
+    margin-bottom: 2rem;
+    color: white;
+    text-align: center;
+}
+.stat-card {
+    background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
+    padding: 1rem;
+    border-radius: 0.5rem;
+    border-left: 4px solid #2563eb;
+    margin-bottom: 1rem;
+}
+.quick-action-btn {
+    background: #2563eb;
+    color: white;
+    padding: 0.75rem 1.5rem;
+    border-radius: 0.5rem;
+    border: none;
+    width: 100%;
+    margin: 0.25rem 0;
+}
+.recent-entry {
+    background: #f8fafc;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    border: 1px solid #e2e8f0;
+    margin-bottom: 0.5rem;
+}
+</style>
+"""
+
+CARD_VIEW_MAX_ENTRIES = 50
+
+_DETAIL_TYPES = tuple(get_detail_types())
+_LOCATIONS = tuple(get_locations())
+_DETAIL_TYPE_INDEX = {value: i for i, value in enumerate(_DETAIL_TYPES)}
+_LOCATION_INDEX = {value: i for i, value in enumerate(_LOCATIONS)}
+
+def _options_for(options, index, current):
+    """Selectbox options and index for a stored value, keeping values no longer offered"""
+    if current in index:
+        return options, index[current]
+    return options + (current,), len(options)
+
+_QUICK_NOTES = (
+    "Pet hair removal", "Extra polish needed", "Heavy cleaning required",
+    "Minor touch-up", "Leather conditioning", "Paint correction"
+)
+
+# View Log card markup, filled per entry with str.format_map
+_ENTRY_CARD_TPL = """
+<div style="background: #f8fafc; padding: 1rem; border-radius: 0.5rem; border: 1px solid #e2e8f0; margin-bottom: 0.5rem;">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <div style="flex: 1;">
+            <div style="font-weight: 600; font-size: 1rem; margin-bottom: 0.25rem;">{license_plate}</div>
+            <div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 0.25rem;">{detail_type} • {advisor}</div>
+            <div style="color: #9ca3af; font-size: 0.75rem;">{entry_date} • {location}</div>
+            {notes_html}
+        </div>
+        <div style="text-align: right; margin-left: 1rem;">
+            <div style="font-weight: bold; color: {hours_color}; font-size: 1.25rem;">{hours}h</div>
+            <div style="color: #6b7280; font-size: 0.75rem;">ID: {id}</div>
+        </div>
+    </div>
+</div>
+"""
+_ENTRY_NOTES_TPL = '<div style="color: #4b5563; font-size: 0.75rem; margin-top: 0.25rem; font-style: italic;">{notes}</div>'
+
+# Initialize database. The resource lives for the whole process, so its
+# connection is closed when the interpreter exits.
 @st.cache_resource
 def init_database():
-    return DetailingDatabase()
+    db = DetailingDatabase()
+    atexit.register(db.close)
+    return db
+
+# Cached reads - the leading underscore tells Streamlit not to hash the db handle
+@st.cache_data(ttl=60, max_entries=128)
+def _cached_recent(_db, limit, advisor=None, since=None):
+    return _db.get_recent_entries(limit=limit, advisor=advisor, since=since)
+
+# Today's numbers are keyed by date so the cache rolls over at midnight
+@st.cache_data(ttl=30, max_entries=8)
+def _cached_today_stats(_db, day):
+    return _db.get_today_stats(day)
+
+@st.cache_data(ttl=30, max_entries=8)
+def _cached_totals(_db):
+    return _db.get_totals()
+
+@st.cache_data(ttl=60, max_entries=128)
+def _cached_by_range(_db, start_date, end_date):
+    return _db.get_entries_by_date_range(start_date, end_date)
+
+@st.cache_data(ttl=60, max_entries=128)
+def _cached_by_plate(_db, license_plate):
+    return _db.search_by_plate_prefix(license_plate)
+
+@st.cache_data(ttl=60, max_entries=128)
+def _cached_search(_db, term, limit, advisor=None, since=None):
+    return _db.search_entries(term, limit=limit, advisor=advisor, since=since)
+
+@st.cache_data(ttl=300, max_entries=4)
+def _cached_advisors(_db):
+    return _db.get_advisors()
+
+@st.cache_data(ttl=60, max_entries=32)
+def _cached_advisor_stats(_db, start_date, end_date):
+    return _db.get_advisor_stats(start_date, end_date)
+
+@st.cache_data(ttl=60, max_entries=64)
+def _cached_entry_counts(_db, column, start_date, end_date):
+    return _db.get_entry_counts(column, start_date, end_date)
+
+# Keyed by date so the preset windows roll over at midnight
+@st.cache_data(ttl=3600, max_entries=2)
+def _date_ranges(day):
+    return get_date_range_options()
+
+@st.cache_data(ttl=60, max_entries=32)
+def _cached_report_df(_db, start_date, end_date):
+    return convert_entries_to_dataframe(_db.get_entries_by_date_range(start_date, end_date))
+
+@st.cache_data(ttl=60, max_entries=16)
+def _cached_report_csv(_db, start_date, end_date):
+    # Built from the report's own cached DataFrame, so the range is read once
+    return export_to_csv(_cached_report_df(_db, start_date, end_date)).encode()
+
+@st.cache_data(max_entries=16)
+def _entries_csv(entry_ids, _entries):
+    # Keyed on the ids of the result set; the rows themselves are not hashed
+    return export_to_csv(convert_entries_to_dataframe(_entries)).encode()
+
+def clear_entry_caches():
+    """Drop cached reads after the entries table changes."""
+    _cached_recent.clear()
+    _cached_today_stats.clear()
+    _cached_totals.clear()
+    _cached_by_range.clear()
+    _cached_by_plate.clear()
+    _cached_search.clear()
+    _cached_advisors.clear()
+    _entries_csv.clear()
+    _cached_report_df.clear()
+    _cached_report_csv.clear()
+    _cached_advisor_stats.clear()
+    _cached_entry_counts.clear()
 
 def main():
     # Page configuration
@@ -24,41 +174,7 @@ def main():
     )
     
     # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .main-header {
-        background: linear-gradient(90deg, #2563eb 0%, #3b82f6 100%);
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin-bottom: 2rem;
-        color: white;
-        text-align: center;
-    }
-    .stat-card {
-        background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #2563eb;
-        margin-bottom: 1rem;
-    }
-    .quick-action-btn {
-        background: #2563eb;
-        color: white;
-        padding: 0.75rem 1.5rem;
-        border-radius: 0.5rem;
-        border: none;
-        width: 100%;
-        margin: 0.25rem 0;
-    }
-    .recent-entry {
-        background: #f8fafc;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border: 1px solid #e2e8f0;
-        margin-bottom: 0.5rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CSS, unsafe_allow_html=True)
     
     # Initialize database
     db = init_database()
@@ -71,41 +187,36 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Check if we need to switch tabs from dashboard buttons
-    if 'active_tab' in st.session_state:
-        if st.session_state.active_tab == "new_entry":
-            default_tab = 1
-        elif st.session_state.active_tab == "view_log":
-            default_tab = 2
-        else:
-            default_tab = 0
-        # Clear the session state after using it
-        if 'active_tab' in st.session_state:
-            del st.session_state.active_tab
-    else:
-        default_tab = 0
-    
-    # Navigation tabs (horizontal instead of sidebar)
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "🏠 Main Dashboard", "📝 New Entry", "📋 View Log", "🔍 Search", "📊 Reports"
-    ])
-    
-    with tab1:
-        show_main_dashboard_page(db)
-    with tab2:
-        show_new_entry_page(db)
-    with tab3:
-        show_view_entries_page(db)
-    with tab4:
-        show_search_filter_page(db)
-    with tab5:
-        show_reports_page(db)
+    # Navigation (horizontal instead of sidebar). Unlike st.tabs, which runs
+    # every tab's body on each rerun, only the selected section is executed.
+    # Pages marked @st.fragment rerun on their own when their widgets change;
+    # the dashboards are not, since their buttons switch the section.
+    pages = {
+        "🏠 Main Dashboard": show_main_dashboard_page,
+        "📝 New Entry": show_new_entry_page,
+        "📋 View Log": show_view_entries_page,
+        "🔍 Search": show_search_filter_page,
+        "📊 Reports": show_reports_page
+    }
+    section = st.radio(
+        "Section", list(pages), horizontal=True, key="section",
+        label_visibility="collapsed"
+    )
+    pages[section](db)
+
+def _go_to_section(section):
+    """Switch the navigation radio from a button callback."""
+    st.session_state.section = section
+
+def _set_dashboard_export(ready):
+    """Arm or disarm the dashboard export from a button callback."""
+    st.session_state.dashboard_export = ready
 
 def show_main_dashboard_page(db):
     """Main dashboard inspired by the wireframe design"""
     
     # Quick stats widget (matching wireframe)
-    stats = db.get_summary_stats()
+    stats = _cached_today_stats(db, date.today().isoformat())
     
     st.markdown("""
     <div class="stat-card">
@@ -139,37 +250,40 @@ def show_main_dashboard_page(db):
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("🚗 Quick New Entry", use_container_width=True, type="primary"):
-            st.session_state.active_tab = "new_entry"
-            st.rerun()
+        st.button("🚗 Quick New Entry", use_container_width=True, type="primary",
+                  on_click=_go_to_section, args=("📝 New Entry",))
     
     with col2:
-        if st.button("📋 View Full Log", use_container_width=True):
-            st.session_state.active_tab = "view_log"
-            st.rerun()
+        st.button("📋 View Full Log", use_container_width=True,
+                  on_click=_go_to_section, args=("📋 View Log",))
     
     with col3:
-        if st.button("📊 Export Data", use_container_width=True):
-            entries = db.get_recent_entries(limit=1000)
-            if entries:
-                df = convert_entries_to_dataframe(entries)
-                csv_data = export_to_csv(df)
-                st.download_button(
-                    label="📁 Download CSV File",
-                    data=csv_data,
-                    file_name=f"detailing_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+        # The export rows and CSV are only built once asked for, and the
+        # download disarms it again so later renders skip that work
+        if st.session_state.get('dashboard_export'):
+            export_entries = _cached_recent(db, 1000)
+            st.download_button(
+                label="📥 Download CSV",
+                data=_entries_csv(tuple(e['id'] for e in export_entries), export_entries),
+                file_name=f"detailing_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                use_container_width=True,
+                disabled=not export_entries,
+                on_click=_set_dashboard_export, args=(False,)
+            )
+        else:
+            st.button("📊 Export Data", use_container_width=True,
+                      on_click=_set_dashboard_export, args=(True,))
     
     # Recent entries section (matching wireframe style)
     st.subheader("Recent Entries")
-    recent_entries = db.get_recent_entries(limit=5)
+    recent_entries = _cached_recent(db, 5)
     
     if recent_entries:
+        html_parts = []
         for entry in recent_entries:
             hours_color = "#dc2626" if entry['hours'] > 3 else "#374151"
-            st.markdown(f"""
+            html_parts.append(f"""
             <div class="recent-entry">
                 <div style="display: flex; justify-content: space-between; align-items: center;">
                     <div style="flex: 1;">
@@ -182,16 +296,28 @@ def show_main_dashboard_page(db):
                     </div>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+        # One markdown element for the whole list instead of one per entry
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
     else:
         st.info("No entries found. Add your first detailing entry to get started!")
 
+def _append_note(note):
+    """Append a quick note to the New Entry notes field."""
+    st.session_state.notes_input = st.session_state.get("notes_input", "") + f"{note}. "
+
+@st.fragment
 def show_new_entry_page(db):
     st.header("🚗 New Detail Entry")
     
-    # Quick notes info (static display to avoid form conflicts)
+    # Quick notes live outside the form; their callbacks write straight into
+    # the notes field's session state, so no extra st.rerun() is needed
     st.markdown("### Quick Notes")
-    st.info("💡 Add common notes like: Pet hair removal, Extra polish needed, Heavy cleaning required, Minor touch-up, Leather conditioning, Paint correction")
+    cols = st.columns(3)
+    for i, note in enumerate(_QUICK_NOTES):
+        with cols[i % 3]:
+            st.button(note, key=f"note_{i}", on_click=_append_note, args=(note,),
+                      use_container_width=True)
     
     # Create form with better styling
     with st.form("new_entry_form", clear_on_submit=True):
@@ -215,19 +341,7 @@ def show_new_entry_page(db):
         with col2:
             detail_type = st.selectbox(
                 "Detail Type *",
-                options=[
-                    "New Vehicle Delivery",
-                    "CPO/Used Vehicle", 
-                    "Customer Car",
-                    "Showroom Detail",
-                    "Demo Vehicle",
-                    "Full Detail",
-                    "Interior Detail",
-                    "Exterior Detail",
-                    "Polish & Wax",
-                    "Basic Wash",
-                    "Other"
-                ],
+                options=_DETAIL_TYPES,
                 help="Select the type of detailing service"
             )
             
@@ -244,10 +358,7 @@ def show_new_entry_page(db):
         with col3:
             location = st.selectbox(
                 "Location *",
-                options=[
-                    "Bay 1", "Bay 2", "Bay 3", "Bay 4",
-                    "Outside", "Service Lane", "Wash Bay", "Detail Shop"
-                ],
+                options=_LOCATIONS,
                 help="Select where the detailing work will be performed"
             )
         
@@ -272,7 +383,8 @@ def show_new_entry_page(db):
             "Additional Notes",
             placeholder="Additional details, issues, or special instructions...",
             help="Optional notes about the detailing service",
-            height=100
+            height=100,
+            key="notes_input"
         )
         
         # Action buttons
@@ -300,8 +412,9 @@ def show_new_entry_page(db):
                     )
                     
                     if success:
-                        show_success_message(f"Entry added successfully for {license_plate.upper()}")
-                        st.balloons()
+                        clear_entry_caches()
+                        # A toast survives the rerun; an inline message would be wiped by it
+                        st.toast(f"✅ Entry added for {license_plate.strip().upper()}", icon="🚗")
                         st.rerun()  # Refresh to show new entry
                     else:
                         show_error_message("Failed to add entry. Please check your database connection.")
@@ -313,7 +426,7 @@ def show_dashboard_page(db):
     st.header("Dashboard Overview")
     
     # Get summary statistics
-    stats = db.get_summary_stats()
+    stats = {**_cached_totals(db), **_cached_today_stats(db, date.today().isoformat())}
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -346,7 +459,7 @@ def show_dashboard_page(db):
     
     # Recent activity
     st.subheader("Recent Activity")
-    recent_entries = db.get_recent_entries(limit=10)
+    recent_entries = _cached_recent(db, 10)
     
     if recent_entries:
         df = convert_entries_to_dataframe(recent_entries)
@@ -361,6 +474,7 @@ def show_dashboard_page(db):
     else:
         st.info("No entries found. Add your first detailing entry to get started!")
 
+@st.fragment
 def show_view_entries_page(db):
     st.header("📋 Complete Detail Log")
     
@@ -370,7 +484,7 @@ def show_view_entries_page(db):
     with col1:
         detailer_filter = st.selectbox(
             "Filter by Detailer:",
-            ["All Detailers", "John Smith", "Maria Garcia", "David Chen"],
+            ["All Detailers", *_cached_advisors(db)],
             help="Filter entries by specific detailer"
         )
     
@@ -400,111 +514,127 @@ def show_view_entries_page(db):
     with col3:
         refresh = st.button("🔄 Refresh", use_container_width=True)
     
-    # Get entries
-    entries = db.get_recent_entries(limit=limit)
+    # Detailer and date filters become plain WHERE conditions in SQL
+    advisor = None if detailer_filter == "All Detailers" else detailer_filter
+    today = date.today()
+    since = {
+        "Last 30 Days": today - timedelta(days=29),
+        "This Week": today - timedelta(days=today.weekday()),
+        "This Month": today.replace(day=1),
+    }.get(date_filter)
+    since = since.isoformat() if since else None
+    
+    # Get entries (search is matched in SQL so the limit applies to matches)
+    if search_term and search_term.strip():
+        entries = _cached_search(db, search_term, limit, advisor, since)
+    else:
+        entries = _cached_recent(db, limit, advisor, since)
     
     if sort_order == "Oldest First":
         entries = list(reversed(entries))
     
-    # Apply search filter if provided
-    if search_term:
-        filtered_entries = []
-        search_lower = search_term.lower()
-        for entry in entries:
-            if (search_lower in entry['license_plate'].lower() or
-                search_lower in entry['detail_type'].lower() or
-                search_lower in entry['advisor'].lower() or
-                (entry['notes'] and search_lower in entry['notes'].lower())):
-                filtered_entries.append(entry)
-        entries = filtered_entries
-    
     if entries:
         # Summary stats (matching wireframe style)
         stats = calculate_duration_stats(entries)
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
+        st.markdown(f"""
+        <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem;">
             <div style="background: #dbeafe; padding: 1rem; border-radius: 0.5rem; text-align: center;">
                 <div style="font-weight: bold; font-size: 1.5rem; color: #2563eb;">{len(entries)}</div>
                 <div style="font-size: 0.75rem; color: #6b7280;">Total Entries</div>
             </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
             <div style="background: #dcfce7; padding: 1rem; border-radius: 0.5rem; text-align: center;">
                 <div style="font-weight: bold; font-size: 1.5rem; color: #059669;">{stats['total']:.1f}</div>
                 <div style="font-size: 0.75rem; color: #6b7280;">Total Hours</div>
             </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
             <div style="background: #fed7aa; padding: 1rem; border-radius: 0.5rem; text-align: center;">
                 <div style="font-weight: bold; font-size: 1.5rem; color: #ea580c;">{stats['avg']:.1f}</div>
                 <div style="font-size: 0.75rem; color: #6b7280;">Avg/Entry</div>
             </div>
-            """, unsafe_allow_html=True)
+        </div>
+        """, unsafe_allow_html=True)
         
         st.divider()
         
-        # Entry list with better styling
-        for i, entry in enumerate(entries):
-            hours_color = "#dc2626" if entry['hours'] > 3 else "#374151"
-            st.markdown(f"""
-            <div style="background: #f8fafc; padding: 1rem; border-radius: 0.5rem; border: 1px solid #e2e8f0; margin-bottom: 0.5rem;">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div style="flex: 1;">
-                        <div style="font-weight: 600; font-size: 1rem; margin-bottom: 0.25rem;">{entry['license_plate']}</div>
-                        <div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 0.25rem;">{entry['detail_type']} • {entry['advisor']}</div>
-                        <div style="color: #9ca3af; font-size: 0.75rem;">{entry['entry_date']} • {entry['location']}</div>
-                        {f'<div style="color: #4b5563; font-size: 0.75rem; margin-top: 0.25rem; font-style: italic;">{entry["notes"][:100]}{"..." if len(entry["notes"] or "") > 100 else ""}</div>' if entry['notes'] else ''}
-                    </div>
-                    <div style="text-align: right; margin-left: 1rem;">
-                        <div style="font-weight: bold; color: {hours_color}; font-size: 1.25rem;">{entry['hours']}h</div>
-                        <div style="color: #6b7280; font-size: 0.75rem;">ID: {entry['id']}</div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Table view by default: one Arrow payload, rows virtualized in the browser.
+        # The HTML card view is only offered for small result sets.
+        card_view = st.toggle(
+            "Card view",
+            value=False,
+            disabled=len(entries) > CARD_VIEW_MAX_ENTRIES,
+            help=f"Available for up to {CARD_VIEW_MAX_ENTRIES} entries"
+        )
+        
+        if card_view and len(entries) <= CARD_VIEW_MAX_ENTRIES:
+            html_parts = []
+            for entry in entries:
+                notes = entry['notes']
+                if notes:
+                    notes_html = _ENTRY_NOTES_TPL.format(
+                        notes=notes if len(notes) <= 100 else notes[:100] + "..."
+                    )
+                else:
+                    notes_html = ''
+                html_parts.append(_ENTRY_CARD_TPL.format_map({
+                    **entry,
+                    'hours_color': "#dc2626" if entry['hours'] > 3 else "#374151",
+                    'notes_html': notes_html,
+                }))
+            st.markdown("".join(html_parts), unsafe_allow_html=True)
+        else:
+            df = convert_entries_to_dataframe(entries)[
+                ['License Plate', 'Detail Type', 'Advisor', 'Date', 'Location', 'Hours', 'Notes']
+            ]
+            styled = df.style.map(
+                lambda h: 'color: #dc2626' if h > 3 else '', subset=['Hours']
+            ).format({'Hours': '{:g}h'})
+            st.dataframe(styled, use_container_width=True, hide_index=True, height=600)
         
         # Export functionality
         st.divider()
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("📥 Download as CSV", use_container_width=True):
-                df = convert_entries_to_dataframe(entries)
-                csv_data = export_to_csv(df)
-                st.download_button(
-                    label="📁 Download CSV File",
-                    data=csv_data,
-                    file_name=f"detailing_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+            st.download_button(
+                label="📥 Download CSV",
+                data=_entries_csv(tuple(e['id'] for e in entries), entries),
+                file_name=f"detailing_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
         
         with col2:
             st.markdown(f"**Showing {len(entries)} entries**")
     else:
         st.info("No entries found. Add your first detailing entry to get started!")
+    
+    # Bulk re-import of a downloaded CSV, written in a single transaction
+    with st.expander("📤 Import Entries (CSV)"):
+        st.caption(f"Uses the download's columns: {', '.join(IMPORT_COLUMNS)}")
+        uploaded_csv = st.file_uploader("CSV file", type="csv", key="import_csv")
+        if uploaded_csv and st.button("📤 Import Entries", use_container_width=True):
+            try:
+                rows, skipped = csv_to_entry_rows(uploaded_csv)
+            except (ValueError, pd.errors.ParserError) as e:
+                show_error_message(f"Could not read CSV: {e}")
+            else:
+                count = db.add_entries_bulk(rows) if rows else 0
+                skipped_note = f" ({skipped} invalid rows skipped)" if skipped else ""
+                if count:
+                    clear_entry_caches()
+                    st.toast(f"✅ Imported {count} entries{skipped_note}")
+                    st.rerun()
+                else:
+                    show_error_message(f"No entries were imported{skipped_note}")
 
 def show_edit_form(db, entry_id):
     st.subheader("Edit Entry")
     
     # Get current entry data
-    entries = db.get_recent_entries(limit=1000)  # Get all to find the specific one
-    current_entry = None
-    
-    for entry in entries:
-        if entry['id'] == entry_id:
-            current_entry = entry
-            break
+    current_entry = db.get_entry_by_id(entry_id)
     
     if not current_entry:
         show_error_message("Entry not found")
-        del st.session_state.edit_entry_id
+        st.session_state.edit_entry_id = None
         st.rerun()
         return
     
@@ -517,11 +647,8 @@ def show_edit_form(db, entry_id):
                 value=current_entry['license_plate']
             )
             
-            detail_type = st.selectbox(
-                "Detail Type *",
-                options=get_detail_types(),
-                index=get_detail_types().index(current_entry['detail_type'])
-            )
+            options, index = _options_for(_DETAIL_TYPES, _DETAIL_TYPE_INDEX, current_entry['detail_type'])
+            detail_type = st.selectbox("Detail Type *", options=options, index=index)
             
             advisor = st.text_input(
                 "Advisor Name *",
@@ -529,11 +656,8 @@ def show_edit_form(db, entry_id):
             )
         
         with col2:
-            location = st.selectbox(
-                "Work Location *",
-                options=get_locations(),
-                index=get_locations().index(current_entry['location'])
-            )
+            options, index = _options_for(_LOCATIONS, _LOCATION_INDEX, current_entry['location'])
+            location = st.selectbox("Work Location *", options=options, index=index)
             
             hours = st.number_input(
                 "Hours *",
@@ -545,7 +669,7 @@ def show_edit_form(db, entry_id):
             
             entry_date = st.date_input(
                 "Service Date *",
-                value=datetime.strptime(current_entry['entry_date'], '%Y-%m-%d').date()
+                value=date.fromisoformat(current_entry['entry_date'])
             )
         
         notes = st.text_area(
@@ -580,16 +704,18 @@ def show_edit_form(db, entry_id):
                 )
                 
                 if success:
-                    show_success_message("Entry updated successfully")
-                    del st.session_state.edit_entry_id
+                    clear_entry_caches()
+                    st.toast("✅ Entry updated successfully")
+                    st.session_state.edit_entry_id = None
                     st.rerun()
                 else:
                     show_error_message("Failed to update entry")
         
         if cancelled:
-            del st.session_state.edit_entry_id
+            st.session_state.edit_entry_id = None
             st.rerun()
 
+@st.fragment
 def show_search_filter_page(db):
     st.header("Search & Filter Entries")
     
@@ -601,24 +727,23 @@ def show_search_filter_page(db):
         search_plate = st.text_input("Enter license plate:", placeholder="ABC-1234")
         
         if st.button("🔍 Search", use_container_width=True) and search_plate:
-            entries = db.get_entries_by_license_plate(search_plate)
+            entries = _cached_by_plate(db, search_plate)
             
             if entries:
-                st.success(f"Found {len(entries)} entries for {search_plate.upper()}")
+                st.success(f"Found {len(entries)} entries for plates starting with {search_plate.upper()}")
                 df = convert_entries_to_dataframe(entries)
                 st.dataframe(df, use_container_width=True, hide_index=True)
             else:
-                st.warning(f"No entries found for {search_plate.upper()}")
+                st.warning(f"No entries found for plates starting with {search_plate.upper()}")
     
     with col2:
         st.subheader("Filter by Date Range")
+        date_ranges = _date_ranges(date.today().isoformat())
         date_range_option = st.selectbox(
             "Select date range:",
-            list(get_date_range_options().keys())
+            list(date_ranges)
         )
         
-        date_ranges = get_date_range_options()
-        
         if date_range_option == "Custom Range":
             col2a, col2b = st.columns(2)
             with col2a:
@@ -629,7 +754,7 @@ def show_search_filter_page(db):
             start_date, end_date = date_ranges[date_range_option]
         
         if st.button("📅 Filter by Date", use_container_width=True):
-            entries = db.get_entries_by_date_range(str(start_date), str(end_date))
+            entries = _cached_by_range(db, str(start_date), str(end_date))
             
             if entries:
                 st.success(f"Found {len(entries)} entries from {start_date} to {end_date}")
@@ -649,6 +774,7 @@ def show_search_filter_page(db):
             else:
                 st.warning(f"No entries found from {start_date} to {end_date}")
 
+@st.fragment
 def show_reports_page(db):
     st.header("Reports & Analytics")
     
@@ -662,54 +788,49 @@ def show_reports_page(db):
         report_end = st.date_input("Report End Date:", value=date.today())
     
     if st.button("📊 Generate Report", use_container_width=True):
-        entries = db.get_entries_by_date_range(str(report_start), str(report_end))
+        # One DataFrame per report range; every aggregate below is derived from it
+        df = _cached_report_df(db, str(report_start), str(report_end))
         
-        if entries:
-            df = convert_entries_to_dataframe(entries)
-            
-            st.success(f"Report generated for {len(entries)} entries")
+        if not df.empty:
+            st.success(f"Report generated for {len(df)} entries")
             
             # Summary statistics
             st.subheader("Summary Statistics")
-            stats = calculate_duration_stats(entries)
+            hours = df['Hours'].agg(['sum', 'mean', 'max'])
             
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Total Entries", len(entries))
+                st.metric("Total Entries", len(df))
             with col2:
-                st.metric("Total Hours", f"{stats['total']:.1f}h")
+                st.metric("Total Hours", f"{hours['sum']:.1f}h")
             with col3:
-                st.metric("Average Hours", f"{stats['avg']:.1f}h")
+                st.metric("Average Hours", f"{hours['mean']:.1f}h")
             with col4:
-                st.metric("Max Hours", f"{stats['max']:.1f}h")
+                st.metric("Max Hours", f"{hours['max']:.1f}h")
             
             # Detail type breakdown
             st.subheader("Detail Type Breakdown")
-            detail_type_counts = df['Detail Type'].value_counts()
-            st.bar_chart(detail_type_counts)
+            detail_type_counts = _cached_entry_counts(db, 'detail_type', str(report_start), str(report_end))
+            st.bar_chart(pd.Series(detail_type_counts, name='count'))
             
             # Advisor performance
             st.subheader("Advisor Performance")
-            advisor_stats = get_advisor_stats(entries)
-            
-            if advisor_stats:
-                advisor_df = pd.DataFrame.from_dict(advisor_stats, orient='index')
-                advisor_df = advisor_df.round(2)
-                st.dataframe(advisor_df, use_container_width=True)
+            advisor_df = pd.DataFrame(
+                _cached_advisor_stats(db, str(report_start), str(report_end))
+            ).set_index('advisor').rename_axis('Advisor')
+            st.dataframe(advisor_df, use_container_width=True)
             
             # Location usage
             st.subheader("Location Usage")
-            location_counts = df['Location'].value_counts()
-            st.bar_chart(location_counts)
+            location_counts = _cached_entry_counts(db, 'location', str(report_start), str(report_end))
+            st.bar_chart(pd.Series(location_counts, name='count'))
             
             # Export report
             st.subheader("Export Report")
-            csv_data = export_to_csv(df, f"detailing_report_{report_start}_{report_end}.csv")
-            
             st.download_button(
                 label="📥 Download Report as CSV",
-                data=csv_data,
+                data=_cached_report_csv(db, str(report_start), str(report_end)),
                 file_name=f"detailing_report_{report_start}_{report_end}.csv",
                 mime="text/csv",
                 use_container_width=True
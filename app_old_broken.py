@@ -1,12 +1,78 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 import streamlit as st
 import sqlite3
 import pandas as pd
+import numpy as np
+import csv
+import io
 from datetime import datetime, date
 import os
 
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'detailing.db'
+READERS = 4
+CHECKPOINT_EVERY = 500
+WRITE_BATCH = 100
+
+DETAIL_TYPES = (
+    "New Vehicle Delivery",
+    "CPO/Used Vehicle",
+    "Customer Car",
+    "Showroom Detail",
+    "Demo Vehicle",
+    "Full Detail",
+    "Interior Detail",
+    "Exterior Detail",
+    "Polish & Wax",
+    "Basic Wash",
+    "Engine Bay",
+    "Other"
+)
+LOCATIONS = (
+    "Bay 1", "Bay 2", "Bay 3", "Bay 4",
+    "Outside", "Service Lane", "Wash Bay", "Detail Shop"
+)
+
+# Table column -> display/CSV header
+ENTRY_COLUMNS = {
+    'id': 'ID', 'license_plate': 'License Plate', 'detail_type': 'Type', 'advisor': 'Advisor',
+    'location': 'Location', 'hours': 'Hours', 'entry_date': 'Date', 'notes': 'Notes', 'created_at': 'Created'
+}
+EXPORT_COLUMNS = list(ENTRY_COLUMNS.values())
+IMPORT_COLUMNS = ['License Plate', 'Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes']
+
+INSERT_ENTRY_SQL = '''
+    INSERT INTO entries (license_plate, detail_type, advisor, location, hours, entry_date, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+'''
+
 # Database functions
+def _connect(readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False, cached_statements=256)
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    pragmas = ["PRAGMA cache_size=-64000", "PRAGMA temp_store=MEMORY", "PRAGMA busy_timeout=5000"]
+    if not readonly:
+        # WAL turns each commit into a log append instead of a full sync and
+        # lets the readers run while an entry is being written
+        pragmas += ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL", "PRAGMA foreign_keys=ON"]
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+@st.cache_resource
 def init_db():
-    conn = sqlite3.connect('detailing.db', check_same_thread=False)
+    """Create the schema; the returned read-write connection belongs to the writer thread"""
+    conn = _connect()
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS entries (
@@ -21,17 +87,159 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Matches get_entries' ORDER BY so the LIMIT stops early, and serves
+    # get_stats' entry_date equality lookups
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_entries_date
+        ON entries(entry_date DESC, created_at DESC)
+    ''')
+    cursor.execute("ANALYZE")
     conn.commit()
+    atexit.register(close_db, conn)
     return conn
 
-def add_entry(conn, license_plate, detail_type, advisor, location, hours, entry_date, notes=""):
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO entries (license_plate, detail_type, advisor, location, hours, entry_date, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (license_plate.upper().strip(), detail_type, advisor.strip(), location, hours, entry_date, notes.strip()))
-    conn.commit()
-    return True
+@st.cache_resource
+def _reader_pool():
+    pool = queue.Queue(maxsize=READERS)
+    atexit.register(_close_readers, pool)
+    return pool
+
+def _close_readers(pool):
+    while not pool.empty():
+        pool.get_nowait().close()
+
+@contextmanager
+def reader():
+    """Borrow a read-only connection so concurrent sessions don't share one handle"""
+    init_db()
+    pool = _reader_pool()
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _connect(readonly=True)
+    try:
+        yield conn
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+def close_db(conn):
+    # Refresh planner stats and fold the WAL back into the database before closing
+    try:
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error as e:
+        logger.warning(f"Could not optimize/checkpoint {DB_PATH} on close: {e}")
+    conn.close()
+
+@st.cache_resource
+def entry_writer():
+    """Start the thread that owns every insert; returns the queue it drains"""
+    conn = init_db()
+    writes = queue.Queue()
+    
+    def run():
+        since_checkpoint = 0
+        while True:
+            batch = [writes.get()]
+            # Fold whatever else is already queued into the same transaction
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                outcomes = []
+                conn.execute("BEGIN")
+                for rows, future, many in batch:
+                    # Each request gets its own savepoint, so a bad row only
+                    # undoes the request it came from, not the rest of the batch
+                    conn.execute("SAVEPOINT request")
+                    try:
+                        if many:
+                            conn.executemany(INSERT_ENTRY_SQL, rows)
+                            result = len(rows)
+                        else:
+                            result = conn.execute(INSERT_ENTRY_SQL, rows[0]).fetchone()[0]
+                        conn.execute("RELEASE request")
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        # Not only sqlite3.Error: a bad value (e.g. an int too
+                        # large for SQLite) must not take the thread down
+                        conn.execute("ROLLBACK TO request")
+                        conn.execute("RELEASE request")
+                        outcomes.append((future, None, e))
+                conn.commit()
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    logger.exception("Could not roll back failed write batch")
+                outcomes = [(future, None, e) for _, future, _ in batch]
+            finally:
+                for _ in batch:
+                    writes.task_done()
+            
+            saved = 0
+            for (rows, _, _), (future, result, error) in zip(batch, outcomes):
+                if error is None:
+                    saved += len(rows)
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+            if saved:
+                # Housekeeping only; a failure here is logged so the writer keeps running
+                try:
+                    # Truncate the WAL every CHECKPOINT_EVERY inserts so it can't grow unbounded
+                    since_checkpoint += saved
+                    if since_checkpoint >= CHECKPOINT_EVERY:
+                        since_checkpoint = 0
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    clear_entry_caches()
+                except Exception:
+                    logger.exception("Post-write checkpoint or cache clear failed")
+    
+    threading.Thread(target=run, name="entry-writer", daemon=True).start()
+    # atexit runs last-registered first, so the queue drains before init_db's close
+    atexit.register(writes.join)
+    return writes
+
+def add_entry(license_plate, detail_type, advisor, location, hours, entry_date, notes=""):
+    """Queue one entry for the writer thread; the returned Future resolves to its new id"""
+    new_id = Future()
+    entry_writer().put(([(license_plate.upper().strip(), detail_type, advisor.strip(), location, hours, entry_date, notes.strip())], new_id, False))
+    return new_id
+
+def add_entries(rows):
+    """Queue many (plate, type, advisor, location, hours, date, notes) rows as one request;
+    the returned Future resolves to how many were saved"""
+    rows = [
+        (plate.upper().strip(), detail_type, advisor.strip(), location, hours, entry_date, (notes or "").strip())
+        for plate, detail_type, advisor, location, hours, entry_date, notes in rows
+    ]
+    saved = Future()
+    if rows:
+        entry_writer().put((rows, saved, True))
+    else:
+        saved.set_result(0)
+    return saved
+
+def import_rows(df):
+    """Rows of an import DataFrame that pass the entry form's checks, plus how many didn't.
+    Hours must be a number in (0, 24] and Date a YYYY-MM-DD date; text in either
+    column would otherwise break the log's date and hours handling"""
+    df = df[IMPORT_COLUMNS].fillna({'Notes': ''})
+    df['License Plate'] = df['License Plate'].str.strip()
+    df['Advisor'] = df['Advisor'].str.strip()
+    df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce').astype(float)
+    dates = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
+    df['Date'] = dates.dt.strftime('%Y-%m-%d')
+    valid = (df['License Plate'].fillna('') != '') & (df['Advisor'].fillna('') != '') \
+        & df['Type'].notna() & df['Location'].notna() \
+        & (df['Hours'] > 0) & (df['Hours'] <= 24) & dates.notna()
+    return list(df[valid].itertuples(index=False, name=None)), int((~valid).sum())
 
 def get_entries(conn, limit=50):
     cursor = conn.cursor()
@@ -42,33 +250,73 @@ def get_entries(conn, limit=50):
     ''', (limit,))
     return cursor.fetchall()
 
+def has_any(conn):
+    return conn.execute("SELECT EXISTS(SELECT 1 FROM entries)").fetchone()[0]
+
+def get_recent(conn, limit):
+    # Only the columns the dashboard cards show; skips notes and created_at
+    return conn.execute('''
+        SELECT id, license_plate, detail_type, advisor, location, hours, entry_date
+        FROM entries
+        ORDER BY entry_date DESC, created_at DESC
+        LIMIT ?
+    ''', (limit,)).fetchall()
+
 def get_stats(conn):
-    cursor = conn.cursor()
-    
-    # Total entries
-    cursor.execute("SELECT COUNT(*) FROM entries")
-    total = cursor.fetchone()[0]
-    
-    # Total hours
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries")
-    total_hours = cursor.fetchone()[0]
-    
-    # Today's entries
-    today = date.today().strftime('%Y-%m-%d')
-    cursor.execute("SELECT COUNT(*) FROM entries WHERE entry_date = ?", (today,))
-    today_count = cursor.fetchone()[0]
-    
-    # Today's hours
-    cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM entries WHERE entry_date = ?", (today,))
-    today_hours = cursor.fetchone()[0]
+    # One pass over the table for the overall and today's figures; entry_date
+    # is stored as ISO text, so SQLite's local date compares directly
+    total, total_hours, avg_hours, today_count, today_hours = conn.execute('''
+        SELECT COUNT(*),
+               COALESCE(SUM(hours), 0),
+               COALESCE(AVG(hours), 0),
+               COUNT(CASE WHEN entry_date = date('now', 'localtime') THEN 1 END),
+               COALESCE(SUM(CASE WHEN entry_date = date('now', 'localtime') THEN hours END), 0)
+        FROM entries
+    ''').fetchone()
     
     return {
         'total': total,
         'total_hours': round(total_hours, 1),
+        'avg_hours': round(avg_hours, 1),
         'today': today_count,
         'today_hours': round(today_hours, 1)
     }
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_stats():
+    with reader() as conn:
+        return get_stats(conn)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_entries(limit):
+    # sqlite3.Row can't be pickled into the cache, so store plain dicts
+    with reader() as conn:
+        return [dict(entry) for entry in get_entries(conn, limit)]
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_recent(limit):
+    with reader() as conn:
+        return [dict(entry) for entry in get_recent(conn, limit)]
+
+def clear_entry_caches():
+    """Drop cached reads after the entries table changes"""
+    _cached_stats.clear()
+    _cached_entries.clear()
+    _cached_recent.clear()
+
+def export_csv(conn):
+    """Stream every entry from SQLite straight into CSV bytes"""
+    # Rows are encoded as they are written, so only the one bytes buffer is held
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(EXPORT_COLUMNS)
+    cursor = conn.execute(f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries ORDER BY entry_date DESC, created_at DESC")
+    while batch := cursor.fetchmany(1000):
+        writer.writerows(batch)
+    text.flush()
+    return buf.getvalue()
+
 # Main app
 def main():
     st.set_page_config(
@@ -85,51 +333,33 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Initialize database
-    if 'db_conn' not in st.session_state:
-        st.session_state.db_conn = init_db()
-    
-    conn = st.session_state.db_conn
+    # Initialize the database and the writer thread that commits inserts
+    entry_writer()
     
     # Navigation tabs
     tab1, tab2, tab3 = st.tabs(["🏠 Dashboard", "📝 New Entry", "📋 View Log"])
     
     with tab1:
-        show_dashboard(conn)
+        show_dashboard()
     
     with tab2:
-        show_new_entry(conn)
+        show_new_entry()
     
     with tab3:
-        show_log(conn)
+        show_log()
 
-def show_dashboard(conn):
-    stats = get_stats(conn)
+@st.fragment
+def show_dashboard():
+    stats = _cached_stats()
     
     # Today's progress
-    st.markdown(f"""
-    <div style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); padding: 1rem; border-radius: 0.5rem; border-left: 4px solid #2563eb; margin-bottom: 1rem;">
-        <h3 style="margin: 0 0 1rem 0; color: #374151;">Today's Progress</h3>
-        <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; text-align: center;">
-            <div>
-                <div style="font-size: 1.5rem; font-weight: bold; color: #2563eb;">{stats['today']}</div>
-                <div style="font-size: 0.875rem; color: #6b7280;">Cars</div>
-            </div>
-            <div>
-                <div style="font-size: 1.5rem; font-weight: bold; color: #059669;">{stats['today_hours']}</div>
-                <div style="font-size: 0.875rem; color: #6b7280;">Hours</div>
-            </div>
-            <div>
-                <div style="font-size: 1.5rem; font-weight: bold; color: #dc2626;">{stats['total']}</div>
-                <div style="font-size: 0.875rem; color: #6b7280;">Total</div>
-            </div>
-            <div>
-                <div style="font-size: 1.5rem; font-weight: bold; color: #7c3aed;">{stats['total_hours']}</div>
-                <div style="font-size: 0.875rem; color: #6b7280;">All Hours</div>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    with st.container(border=True):
+        st.subheader("Today's Progress")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Cars", stats['today'])
+        c2.metric("Hours", stats['today_hours'])
+        c3.metric("Total", stats['total'])
+        c4.metric("All Hours", stats['total_hours'])
     
     # Quick actions
     col1, col2, col3 = st.columns(3)
@@ -145,13 +375,14 @@ def show_dashboard(conn):
             st.rerun()
     
     with col3:
-        entries = get_entries(conn, 1000)
-        if entries and st.button("📊 Export Data", use_container_width=True):
-            df = pd.DataFrame(entries, columns=['ID', 'License Plate', 'Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes', 'Created'])
-            csv = df.to_csv(index=False)
+        with reader() as conn:
+            show_export = has_any(conn)
+        if show_export and st.button("📊 Export Data", use_container_width=True):
+            with reader() as conn:
+                csv_data = export_csv(conn)
             st.download_button(
                 "📁 Download CSV",
-                csv,
+                csv_data,
                 f"detailing_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 "text/csv",
                 use_container_width=True
@@ -159,29 +390,22 @@ def show_dashboard(conn):
     
     # Recent entries
     st.subheader("Recent Entries")
-    entries = get_entries(conn, 5)
+    entries = _cached_recent(5)
     
     if entries:
         for entry in entries:
-            hours_color = "#dc2626" if entry[5] > 3 else "#374151"
-            st.markdown(f"""
-            <div style="background: #f8fafc; padding: 1rem; border-radius: 0.5rem; border: 1px solid #e2e8f0; margin-bottom: 0.5rem;">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div style="flex: 1;">
-                        <div style="font-weight: 600; font-size: 1rem;">{entry[1]}</div>
-                        <div style="color: #6b7280; font-size: 0.875rem;">{entry[2]} • {entry[3]}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-weight: bold; color: {hours_color};">{entry[5]}h</div>
-                        <div style="color: #6b7280; font-size: 0.75rem;">{entry[4]}</div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            hours = f"**{entry['hours']}h**"
+            with st.container(border=True):
+                left, right = st.columns([4, 1])
+                left.markdown(f"**{entry['license_plate']}**")
+                left.caption(f"{entry['detail_type']} • {entry['advisor']}")
+                right.markdown(f":red[{hours}]" if entry['hours'] > 3 else hours)
+                right.caption(entry['location'])
     else:
         st.info("No entries yet. Add your first entry to get started!")
 
-def show_new_entry(conn):
+@st.fragment
+def show_new_entry():
     st.header("Add New Entry")
     
     st.info("💡 Common notes: Pet hair removal, Extra polish needed, Heavy cleaning required, Minor touch-up, Leather conditioning, Paint correction")
@@ -189,27 +413,11 @@ def show_new_entry(conn):
     with st.form("new_entry"):
         license_plate = st.text_input("License Plate *", placeholder="ABC-123")
         
-        detail_type = st.selectbox("Detail Type *", [
-            "New Vehicle Delivery",
-            "CPO/Used Vehicle", 
-            "Customer Car",
-            "Showroom Detail",
-            "Demo Vehicle",
-            "Full Detail",
-            "Interior Detail",
-            "Exterior Detail",
-            "Polish & Wax",
-            "Basic Wash",
-            "Engine Bay",
-            "Other"
-        ])
+        detail_type = st.selectbox("Detail Type *", DETAIL_TYPES)
         
         advisor = st.text_input("Advisor/Detailer Name *", placeholder="Enter name")
         
-        location = st.selectbox("Location *", [
-            "Bay 1", "Bay 2", "Bay 3", "Bay 4",
-            "Outside", "Service Lane", "Wash Bay", "Detail Shop"
-        ])
+        location = st.selectbox("Location *", LOCATIONS)
         
         hours = st.number_input("Hours *", min_value=0.1, max_value=24.0, step=0.1, value=1.0)
         
@@ -228,21 +436,44 @@ def show_new_entry(conn):
             st.error("❌ Hours must be greater than 0")
         else:
             try:
-                success = add_entry(conn, license_plate, detail_type, advisor, location, hours, str(entry_date), notes)
-                if success:
-                    st.success(f"✅ Entry added successfully for {license_plate.upper()}")
+                # Wait for the writer thread to commit it (it also clears the
+                # cached reads); a failed insert raises here, in this session
+                if add_entry(license_plate, detail_type, advisor, location, hours, str(entry_date), notes).result(timeout=30):
+                    st.toast(f"✅ Entry added successfully for {license_plate.upper().strip()}")
                     st.balloons()
                     st.rerun()
             except Exception as e:
                 st.error(f"❌ Error: {e}")
+    
+    with st.expander("📥 Bulk Import CSV"):
+        st.caption(f"Columns: {', '.join(IMPORT_COLUMNS)} (same layout as the export)")
+        uploaded = st.file_uploader("Bulk import CSV", type="csv")
+        if uploaded and st.button("Import Entries", use_container_width=True):
+            try:
+                df = pd.read_csv(uploaded, dtype={'License Plate': str, 'Advisor': str, 'Notes': str})
+                missing = [col for col in IMPORT_COLUMNS if col not in df.columns]
+                if missing:
+                    st.error(f"❌ Missing columns: {', '.join(missing)}")
+                else:
+                    rows, skipped = import_rows(df)
+                    count = add_entries(rows).result(timeout=120)
+                    skipped_note = f" ({skipped} invalid rows skipped)" if skipped else ""
+                    if count:
+                        st.toast(f"✅ Imported {count} entries{skipped_note}")
+                        st.rerun()
+                    else:
+                        st.error(f"❌ No entries were imported{skipped_note}")
+            except Exception as e:
+                st.error(f"❌ Error: {e}")
 
-def show_log(conn):
+@st.fragment
+def show_log():
     st.header("Entry Log")
     
-    entries = get_entries(conn, 100)
+    entries = _cached_entries(100)
     
     if entries:
-        stats = get_stats(conn)
+        stats = _cached_stats()
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -250,39 +481,34 @@ def show_log(conn):
         with col2:
             st.metric("Total Hours", f"{stats['total_hours']}h")
         with col3:
-            avg_hours = stats['total_hours'] / max(stats['total'], 1)
-            st.metric("Average Hours", f"{avg_hours:.1f}h")
+            st.metric("Average Hours", f"{stats['avg_hours']:.1f}h")
         
         st.divider()
         
-        for entry in entries:
-            hours_color = "#dc2626" if entry[5] > 3 else "#374151"
-            notes_text = f'<div style="color: #4b5563; font-size: 0.75rem; margin-top: 0.25rem; font-style: italic;">{entry[7][:100]}{"..." if len(entry[7] or "") > 100 else ""}</div>' if entry[7] else ''
-            
-            st.markdown(f"""
-            <div style="background: #f8fafc; padding: 1rem; border-radius: 0.5rem; border: 1px solid #e2e8f0; margin-bottom: 0.5rem;">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div style="flex: 1;">
-                        <div style="font-weight: 600; font-size: 1rem; margin-bottom: 0.25rem;">{entry[1]}</div>
-                        <div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 0.25rem;">{entry[2]} • {entry[3]}</div>
-                        <div style="color: #9ca3af; font-size: 0.75rem;">{entry[6]} • {entry[4]}</div>
-                        {notes_text}
-                    </div>
-                    <div style="text-align: right; margin-left: 1rem;">
-                        <div style="font-weight: bold; color: {hours_color}; font-size: 1.25rem;">{entry[5]}h</div>
-                        <div style="color: #6b7280; font-size: 0.75rem;">ID: {entry[0]}</div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        df = pd.DataFrame(entries).rename(columns=ENTRY_COLUMNS)[
+            ['License Plate', 'Type', 'Advisor', 'Location', 'Date', 'Hours', 'Notes', 'ID']
+        ]
+        df['Date'] = pd.to_datetime(df['Date'])
+        # Long-job marker computed for the whole column at once
+        df.insert(0, '⚠', np.where(df['Hours'] > 3, '🔴', '⏱️'))
+        st.dataframe(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'Hours': st.column_config.NumberColumn(format="%.1fh"),
+                'Date': st.column_config.DateColumn(),
+                'Notes': st.column_config.TextColumn(width="medium")
+            }
+        )
         
         st.divider()
         if st.button("📥 Export All Entries", use_container_width=True):
-            df = pd.DataFrame(entries, columns=['ID', 'License Plate', 'Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes', 'Created'])
-            csv = df.to_csv(index=False)
+            with reader() as conn:
+                csv_data = export_csv(conn)
             st.download_button(
                 "📁 Download CSV File",
-                csv,
+                csv_data,
                 f"detailing_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 "text/csv",
                 use_container_width=True
@@ -1,29 +1,77 @@
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection tuning applied once when the shared connection is opened
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000"
+)
+
+_RECENT_ENTRIES_SQL = """
+    SELECT id, license_plate, detail_type, advisor, location, 
+           hours, entry_date, created_at, notes
+    FROM detailing_entries 
+    ORDER BY entry_date DESC, created_at DESC
+    LIMIT ?
+"""
+
+_DATE_RANGE_SQL = """
+    SELECT id, license_plate, detail_type, advisor, location, 
+           hours, entry_date, created_at, notes
+    FROM detailing_entries 
+    WHERE entry_date BETWEEN ? AND ?
+    ORDER BY entry_date DESC, created_at DESC
+"""
+
 class DetailingDatabase:
     def __init__(self, db_path: str = "detailing_tracker.db"):
         """Initialize the database connection and create tables if they don't exist."""
         self.db_path = db_path
+        self.conn = self._connect()
+        self._lock = threading.RLock()
         self.init_database()
     
-    def get_connection(self):
-        """Get a database connection with proper settings."""
+    def _connect(self):
+        """Open the shared connection used by every query."""
         try:
             conn = sqlite3.connect(self.db_path, check_same_thread=False)
             conn.row_factory = sqlite3.Row  # Enable column access by name
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
             return conn
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
+    @contextmanager
+    def get_connection(self):
+        """Use the shared database connection for one transaction.
+        
+        Used as ``with self.get_connection() as conn:``. The block holds a lock
+        so sessions sharing this object can't interleave, and commits on success
+        or rolls back on error, leaving the connection open for reuse.
+        """
+        with self._lock, self.conn:
+            yield self.conn
+    
+    def close(self):
+        """Close the shared connection; SQLite checkpoints and removes the WAL files."""
+        try:
+            self.conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error closing database: {e}")
+    
     def init_database(self):
         """Create the database tables if they don't exist."""
         try:
@@ -45,17 +93,31 @@ class DetailingDatabase:
                     )
                 """)
                 
-                # Create index for faster queries
+                # Create index for faster queries; created_at matches the
+                # ORDER BY tie-break so recent-entry pages need no sort step
                 cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_entry_date 
-                    ON detailing_entries(entry_date DESC)
+                    CREATE INDEX IF NOT EXISTS idx_entry_date_created 
+                    ON detailing_entries(entry_date DESC, created_at DESC)
                 """)
+                cursor.execute("DROP INDEX IF EXISTS idx_entry_date")
                 
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_license_plate 
                     ON detailing_entries(license_plate)
                 """)
                 
+                # Case-insensitive plate index so LIKE prefix searches can seek
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_license_plate_nocase 
+                    ON detailing_entries(license_plate COLLATE NOCASE)
+                """)
+                
+                # Per-advisor reporting over a date range
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_advisor_date 
+                    ON detailing_entries(advisor, entry_date DESC)
+                """)
+                
                 conn.commit()
                 logger.info("SQLite database initialized successfully")
                 
@@ -85,19 +147,88 @@ class DetailingDatabase:
             logger.error(f"Error adding entry: {e}")
             return False
     
-    def get_recent_entries(self, limit: int = 50) -> List[Dict]:
-        """Get recent detailing entries, ordered by date (most recent first)."""
+    def add_entries_bulk(self, rows: List[tuple]) -> int:
+        """Add many entries in one transaction.
+        
+        Each row is (license_plate, detail_type, advisor, location, hours,
+        entry_date, notes). Returns the number of rows inserted, or 0 if the
+        batch was rolled back.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.executemany("""
+                    INSERT INTO detailing_entries
+                    (license_plate, detail_type, advisor, location, hours, entry_date, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, ((plate.upper().strip(), detail_type, advisor.strip(),
+                       location, hours, entry_date, (notes or "").strip())
+                      for plate, detail_type, advisor, location, hours, entry_date, notes in rows))
+                
+                logger.info(f"Added {cursor.rowcount} entries")
+                return cursor.rowcount
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error adding entries: {e}")
+            return 0
+    
+    def update_entry(self, entry_id: int, license_plate: str, detail_type: str, advisor: str,
+                     location: str, hours: float, entry_date: str, notes: str = "") -> bool:
+        """Update an existing detailing entry by its primary key."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
-                    SELECT id, license_plate, detail_type, advisor, location, 
-                           hours, entry_date, created_at, notes
-                    FROM detailing_entries 
-                    ORDER BY entry_date DESC, created_at DESC
-                    LIMIT ?
-                """, (limit,))
+                    UPDATE detailing_entries
+                    SET license_plate = ?, detail_type = ?, advisor = ?, location = ?,
+                        hours = ?, entry_date = ?, notes = ?
+                    WHERE id = ?
+                """, (license_plate.upper().strip(), detail_type, advisor.strip(),
+                      location, hours, entry_date, notes.strip(), entry_id))
+                
+                conn.commit()
+                logger.info(f"Updated entry {entry_id}")
+                return cursor.rowcount == 1
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error updating entry: {e}")
+            return False
+    
+    @staticmethod
+    def _entry_filters(advisor: Optional[str], since: Optional[str]):
+        """Build the optional advisor / start-date WHERE conditions and parameters."""
+        conditions, params = [], []
+        if advisor:
+            conditions.append("advisor = ?")
+            params.append(advisor)
+        if since:
+            conditions.append("entry_date >= ?")
+            params.append(since)
+        return conditions, params
+    
+    def get_recent_entries(self, limit: int = 50, advisor: Optional[str] = None,
+                           since: Optional[str] = None) -> List[Dict]:
+        """Get recent detailing entries, ordered by date (most recent first).
+        
+        Optionally restricted to a single advisor and/or entries dated on or
+        after ``since`` (YYYY-MM-DD).
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                conditions, params = self._entry_filters(advisor, since)
+                if conditions:
+                    cursor.execute(f"""
+                        SELECT id, license_plate, detail_type, advisor, location, 
+                               hours, entry_date, created_at, notes
+                        FROM detailing_entries 
+                        WHERE {" AND ".join(conditions)}
+                        ORDER BY entry_date DESC, created_at DESC
+                        LIMIT ?
+                    """, (*params, limit))
+                else:
+                    cursor.execute(_RECENT_ENTRIES_SQL, (limit,))
                 
                 rows = cursor.fetchall()
                 return [dict(row) for row in rows]
@@ -106,8 +237,21 @@ class DetailingDatabase:
             logger.error(f"Error fetching recent entries: {e}")
             return []
     
-    def get_entries_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
-        """Get entries within a specific date range."""
+    def get_advisors(self) -> List[str]:
+        """Get the distinct advisor names that have entries."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT DISTINCT advisor FROM detailing_entries ORDER BY advisor")
+                return [row[0] for row in cursor.fetchall()]
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching advisors: {e}")
+            return []
+    
+    def get_entry_by_id(self, entry_id: int) -> Optional[Dict]:
+        """Get a single entry by its primary key."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -116,17 +260,82 @@ class DetailingDatabase:
                     SELECT id, license_plate, detail_type, advisor, location, 
                            hours, entry_date, created_at, notes
                     FROM detailing_entries 
+                    WHERE id = ?
+                """, (entry_id,))
+                
+                row = cursor.fetchone()
+                return dict(row) if row else None
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching entry {entry_id}: {e}")
+            return None
+    
+    def get_entries_by_date_range(self, start_date, end_date) -> List[Dict]:
+        """Get entries within a specific date range.
+        
+        Accepts ``date`` objects or YYYY-MM-DD strings; both bind as ISO text,
+        which is how entry_date is stored.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(_DATE_RANGE_SQL, (str(start_date), str(end_date)))
+                
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows]
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching entries by date range: {e}")
+            return []
+    
+    def get_advisor_stats(self, start_date: str, end_date: str) -> List[Dict]:
+        """Get per-advisor entry counts and hours within a date range."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT advisor, COUNT(*) AS entries, 
+                           ROUND(SUM(hours), 2) AS total_hours,
+                           ROUND(AVG(hours), 2) AS avg_hours,
+                           MAX(hours) AS max_hours,
+                           COUNT(DISTINCT detail_type) AS unique_detail_types
+                    FROM detailing_entries 
                     WHERE entry_date BETWEEN ? AND ?
-                    ORDER BY entry_date DESC, created_at DESC
+                    GROUP BY advisor
+                    ORDER BY total_hours DESC
                 """, (start_date, end_date))
                 
                 rows = cursor.fetchall()
                 return [dict(row) for row in rows]
                 
         except sqlite3.Error as e:
-            logger.error(f"Error fetching entries by date range: {e}")
+            logger.error(f"Error fetching advisor stats: {e}")
             return []
     
+    def get_entry_counts(self, column: str, start_date: str, end_date: str) -> Dict[str, int]:
+        """Count entries per detail_type or location within a date range."""
+        if column not in ('detail_type', 'location'):
+            raise ValueError(f"Cannot group entries by {column!r}")
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f"""
+                    SELECT {column}, COUNT(*) FROM detailing_entries 
+                    WHERE entry_date BETWEEN ? AND ?
+                    GROUP BY {column}
+                    ORDER BY COUNT(*) DESC
+                """, (start_date, end_date))
+                
+                return dict(cursor.fetchall())
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching {column} counts: {e}")
+            return {}
+    
     def get_entries_by_license_plate(self, license_plate: str) -> List[Dict]:
         """Get all entries for a specific license plate."""
         try:
@@ -148,32 +357,93 @@ class DetailingDatabase:
             logger.error(f"Error fetching entries by license plate: {e}")
             return []
     
-    def get_summary_stats(self) -> dict:
-        """Get summary statistics for the dashboard."""
+    def search_by_plate_prefix(self, prefix: str, limit: int = 500) -> List[Dict]:
+        """Get up to ``limit`` entries whose license plate starts with the given text.
+        
+        The prefix LIKE is case-insensitive and range-scans
+        idx_license_plate_nocase; % and _ in the input match literally.
+        """
+        prefix = prefix.upper().strip()
+        prefix = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Total entries
-                cursor.execute("SELECT COUNT(*) FROM detailing_entries")
-                result = cursor.fetchone()
-                total_entries = result[0] if result else 0
+                cursor.execute("""
+                    SELECT id, license_plate, detail_type, advisor, location, 
+                           hours, entry_date, created_at, notes
+                    FROM detailing_entries 
+                    WHERE license_plate LIKE ? ESCAPE '\\'
+                    ORDER BY entry_date DESC, created_at DESC
+                    LIMIT ?
+                """, (prefix + "%", limit))
                 
-                # Total hours
-                cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM detailing_entries")
-                result = cursor.fetchone()
-                total_hours = float(result[0]) if result else 0
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows]
                 
-                # Today's entries
-                today = datetime.now().strftime('%Y-%m-%d')
-                cursor.execute("SELECT COUNT(*) FROM detailing_entries WHERE entry_date = ?", (today,))
-                result = cursor.fetchone()
-                today_entries = result[0] if result else 0
+        except sqlite3.Error as e:
+            logger.error(f"Error searching entries by plate prefix: {e}")
+            return []
+    
+    def search_entries(self, term: str, limit: int = 50, advisor: Optional[str] = None,
+                       since: Optional[str] = None) -> List[Dict]:
+        """Search plate, detail type, advisor and notes, most recent first."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
                 
-                # Today's hours
-                cursor.execute("SELECT COALESCE(SUM(hours), 0) FROM detailing_entries WHERE entry_date = ?", (today,))
-                result = cursor.fetchone()
-                today_hours = float(result[0]) if result else 0
+                pattern = f"%{term.strip()}%"
+                conditions, params = self._entry_filters(advisor, since)
+                conditions.insert(0, """(license_plate LIKE ? OR detail_type LIKE ? 
+                       OR advisor LIKE ? OR notes LIKE ?)""")
+                cursor.execute(f"""
+                    SELECT id, license_plate, detail_type, advisor, location, 
+                           hours, entry_date, created_at, notes
+                    FROM detailing_entries 
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY entry_date DESC, created_at DESC
+                    LIMIT ?
+                """, (pattern, pattern, pattern, pattern, *params, limit))
+                
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows]
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error searching entries: {e}")
+            return []
+    
+    def get_today_stats(self, day: Optional[str] = None) -> dict:
+        """Get entry count and hours for a single day (defaults to today)."""
+        if day is None:
+            day = datetime.now().strftime('%Y-%m-%d')
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT COUNT(*), COALESCE(SUM(hours), 0) 
+                    FROM detailing_entries 
+                    WHERE entry_date = ?
+                """, (day,))
+                today_entries, today_hours = cursor.fetchone()
+                
+                return {
+                    'today_entries': today_entries,
+                    'today_hours': round(float(today_hours), 2)
+                }
+                
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching today's stats: {e}")
+            return {'today_entries': 0, 'today_hours': 0}
+    
+    def get_totals(self) -> dict:
+        """Get all-time entry count, hours and most common detail type."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT COUNT(*), COALESCE(SUM(hours), 0) FROM detailing_entries")
+                total_entries, total_hours = cursor.fetchone()
                 
                 # Most common detail type
                 cursor.execute("""
@@ -188,18 +458,41 @@ class DetailingDatabase:
                 
                 return {
                     'total_entries': total_entries,
-                    'total_hours': round(total_hours, 2),
-                    'today_entries': today_entries,
-                    'today_hours': round(today_hours, 2),
+                    'total_hours': round(float(total_hours), 2),
                     'most_common_type': most_common_type
                 }
                 
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching totals: {e}")
+            return {'total_entries': 0, 'total_hours': 0, 'most_common_type': 'N/A'}
+    
+    def get_summary_stats(self) -> dict:
+        """Get summary statistics for the dashboard in a single query."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT COUNT(*), COALESCE(SUM(hours), 0),
+                           COALESCE(SUM(CASE WHEN entry_date = ? THEN 1 ELSE 0 END), 0),
+                           COALESCE(SUM(CASE WHEN entry_date = ? THEN hours ELSE 0 END), 0),
+                           (SELECT detail_type FROM detailing_entries
+                            GROUP BY detail_type ORDER BY COUNT(*) DESC LIMIT 1)
+                    FROM detailing_entries
+                """, (today, today))
+                (total_entries, total_hours, today_entries, today_hours,
+                 most_common_type) = cursor.fetchone()
+                
+                return {
+                    'total_entries': total_entries,
+                    'total_hours': round(float(total_hours), 2),
+                    'most_common_type': most_common_type or "N/A",
+                    'today_entries': today_entries,
+                    'today_hours': round(float(today_hours), 2)
+                }
+        
         except sqlite3.Error as e:
             logger.error(f"Error fetching summary stats: {e}")
-            return {
-                'total_entries': 0,
-                'total_hours': 0,
-                'today_entries': 0,
-                'today_hours': 0,
-                'most_common_type': 'N/A'
-            }
\ No newline at end of file
+            return {'total_entries': 0, 'total_hours': 0, 'most_common_type': 'N/A',
+                    'today_entries': 0, 'today_hours': 0}
@@ -36,52 +36,83 @@ def format_license_plate(plate: str) -> str:
 def get_detail_types() -> List[str]:
     """Get list of available detail types."""
     return [
+        "New Vehicle Delivery",
+        "CPO/Used Vehicle",
+        "Customer Car",
+        "Showroom Detail",
+        "Demo Vehicle",
         "Full Detail",
         "Interior Detail",
-        "Exterior Detail", 
+        "Exterior Detail",
         "Polish & Wax",
         "Basic Wash",
         "Engine Bay",
         "Headlight Restoration",
         "Paint Correction",
         "Ceramic Coating",
-        "Quick Detail"
+        "Quick Detail",
+        "Other"
     ]
 
 def get_locations() -> List[str]:
     """Get list of available work locations/bays."""
     return [
         "Bay 1",
-        "Bay 2", 
+        "Bay 2",
         "Bay 3",
         "Bay 4",
         "Outside Area",
         "Prep Area",
+        "Service Lane",
+        "Wash Bay",
         "Detail Shop"
     ]
 
+# Database column -> display column, in display order
+DISPLAY_COLUMNS = {
+    'id': 'ID',
+    'license_plate': 'License Plate',
+    'detail_type': 'Detail Type',
+    'advisor': 'Advisor',
+    'location': 'Location',
+    'hours': 'Hours',
+    'entry_date': 'Date',
+    'notes': 'Notes'
+}
+
 def convert_entries_to_dataframe(entries: List) -> pd.DataFrame:
     """Convert database entries to pandas DataFrame for display."""
     if not entries:
-        return pd.DataFrame(columns=[
-            'ID', 'License Plate', 'Detail Type', 'Advisor', 
-            'Location', 'Hours', 'Date', 'Notes'
-        ])
-    
-    data = []
-    for entry in entries:
-        data.append({
-            'ID': entry['id'],
-            'License Plate': entry['license_plate'],
-            'Detail Type': entry['detail_type'],
-            'Advisor': entry['advisor'],
-            'Location': entry['location'],
-            'Hours': entry['hours'],
-            'Date': entry['entry_date'],
-            'Notes': entry['notes'] if entry['notes'] else ''
-        })
-    
-    return pd.DataFrame(data)
+        return pd.DataFrame(columns=list(DISPLAY_COLUMNS.values()))
+    
+    df = pd.DataFrame(entries, columns=list(DISPLAY_COLUMNS))
+    df = df.rename(columns=DISPLAY_COLUMNS)
+    df['Notes'] = df['Notes'].fillna('')
+    return df
+
+# Columns a downloaded CSV must have to be imported back
+IMPORT_COLUMNS = ['License Plate', 'Detail Type', 'Advisor', 'Location', 'Hours', 'Date', 'Notes']
+
+def csv_to_entry_rows(csv_file) -> tuple:
+    """Read a CSV in the download layout into rows for add_entries_bulk.
+    
+    Rows are held to the entry form's rules: a plate and advisor, hours in
+    (0, 24] and a YYYY-MM-DD date. Returns (rows, number of rows skipped).
+    """
+    df = pd.read_csv(csv_file, dtype={'License Plate': str, 'Advisor': str, 'Notes': str})
+    missing = [col for col in IMPORT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    df = df[IMPORT_COLUMNS].fillna({'Notes': ''})
+    df['License Plate'] = df['License Plate'].str.strip()
+    df['Advisor'] = df['Advisor'].str.strip()
+    df['Hours'] = pd.to_numeric(df['Hours'], errors='coerce').astype(float)
+    dates = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
+    df['Date'] = dates.dt.strftime('%Y-%m-%d')
+    valid = (df['License Plate'].fillna('') != '') & (df['Advisor'].fillna('') != '') \
+        & df['Detail Type'].notna() & df['Location'].notna() \
+        & (df['Hours'] > 0) & (df['Hours'] <= 24) & dates.notna()
+    return list(df[valid].itertuples(index=False, name=None)), int((~valid).sum())
 
 def format_hours(hours: float) -> str:
     """Format hours for display."""
@@ -132,37 +163,27 @@ def calculate_duration_stats(entries: List) -> Dict[str, float]:
         return {'min': 0, 'max': 0, 'avg': 0, 'total': 0}
     
     hours_list = [entry['hours'] for entry in entries]
+    total = sum(hours_list)
     
     return {
         'min': min(hours_list),
         'max': max(hours_list),
-        'avg': sum(hours_list) / len(hours_list),
-        'total': sum(hours_list)
+        'avg': total / len(hours_list),
+        'total': total
     }
 
 def get_advisor_stats(entries: List) -> Dict[str, Dict]:
     """Get statistics grouped by advisor."""
-    advisor_stats = {}
-    
-    for entry in entries:
-        advisor = entry['advisor']
-        if advisor not in advisor_stats:
-            advisor_stats[advisor] = {
-                'entries': 0,
-                'total_hours': 0,
-                'detail_types': set()
-            }
-        
-        advisor_stats[advisor]['entries'] += 1
-        advisor_stats[advisor]['total_hours'] += entry['hours']
-        advisor_stats[advisor]['detail_types'].add(entry['detail_type'])
-    
-    # Convert sets to counts for easier display
-    for advisor in advisor_stats:
-        advisor_stats[advisor]['unique_detail_types'] = len(advisor_stats[advisor]['detail_types'])
-        del advisor_stats[advisor]['detail_types']
-    
-    return advisor_stats
+    if not entries:
+        return {}
+    
+    df = pd.DataFrame(entries, columns=['advisor', 'hours', 'detail_type'])
+    grouped = df.groupby('advisor', sort=False).agg(
+        entries=('hours', 'count'),
+        total_hours=('hours', 'sum'),
+        unique_detail_types=('detail_type', 'nunique')
+    )
+    return grouped.to_dict('index')
 
 def format_currency(amount: float, rate_per_hour: float = 0) -> str:
     """Format currency for revenue calculations if rates are provided."""